@@ -1,25 +1,17 @@
 # A* search algorithm (Node, heuristic, step-by-step search)
 
 import heapq  # For implementing the priority queue
-from constants import moves  # Not used in this file but may be used externally
-from maze import is_valid    # Not used here but possibly for more complex validation
-from constants import ROWS, COLS  # Grid boundaries
+from collections import namedtuple  # For the headless search result
+from grid import FREE_TO_DIGIT  # Cell bytes -> binary digits for the JPS row bitmasks
 
-# Get all valid neighbor positions (up, down, left, right)
-def get_neighbors(position):
-    row, col = position
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Cardinal directions
-    neighbors = []
+# Get all free neighbor positions (up, down, left, right) from the grid
+def get_neighbors(position, grid):
+    return grid.neighbors(position)
 
-    for dr, dc in directions:
-        r, c = row + dr, col + dc
-        if 0 <= r < ROWS and 0 <= c < COLS:  # Ensure within bounds
-            neighbors.append((r, c))
-
-    return neighbors
-
-# Node class used for A* search
+# Node class used for A* search (slots keep each node small, no per-instance __dict__)
 class Node:
+    __slots__ = ('position', 'g', 'h', 'f', 'parent')
+
     def __init__(self, position, g, h, parent=None):
         self.position = position       # (row, col) position of the node
         self.g = g                     # Cost from start node to this node
@@ -28,7 +20,42 @@ class Node:
         self.parent = parent           # Parent node in the path
 
     def __lt__(self, other):
-        return self.f < other.f        # Comparison based on f for priority queue ordering
+        # Order by f; on equal f prefer the lower h (closer to the goal), which avoids
+        # expanding whole plateaus of equal-f nodes on open grids
+        if self.f != other.f:
+            return self.f < other.f
+        return self.h < other.h
+
+# Open list for solve_astar: a heap of (f, h, counter, cell) tuples with lazy deletion.
+# Ties on f go to the lower h, then to the earlier push. When a cell's g improves the old
+# entry is left in the heap and skipped on pop, instead of being searched for and removed.
+class OpenList:
+    __slots__ = ('heap', 'best_g', 'counter')
+
+    def __init__(self):
+        self.heap = []
+        self.best_g = {}   # Best known g per cell; -1 once the cell has been popped (closed)
+        self.counter = 0   # Insertion counter used as the final tie-breaker
+
+    # Add a cell with cost g and heuristic h (callers check best_g first to skip non-improvements)
+    def push(self, cell, g, h):
+        self.best_g[cell] = g
+        self.counter += 1
+        heapq.heappush(self.heap, (g + h, h, self.counter, cell))
+
+    # Pop the best live cell as (cell, g), skipping stale entries; None when the list is exhausted
+    def pop(self):
+        heap, best_g = self.heap, self.best_g
+        while heap:
+            f, h, _, cell = heapq.heappop(heap)
+            g = f - h
+            if g == best_g[cell]:
+                best_g[cell] = -1  # Closed: every later entry or improvement check for it fails
+                return cell, g
+        return None
+
+    def __len__(self):
+        return len(self.heap)  # Includes stale entries not yet skipped
 
 # Heuristic function using Manhattan distance
 def heuristic(a, b):
@@ -42,28 +69,256 @@ def reconstruct_path(node):
         node = node.parent
     return path[::-1]  # Reverse to get path from start to goal
 
+# Pop the best node from a Node heap, discarding stale duplicates of already visited positions
+# (pop is the heap pop to use, e.g. TrackedHeap.heappop for the GUI's undo-tracked heap)
+def pop_node(open_set, visited, pop=heapq.heappop):
+    while open_set:
+        node = pop(open_set)
+        if node.position not in visited:
+            return node
+    return None
+
+# Follow a parents mapping back from cell to the root and return the path root -> cell
+def trace_parents(parents, cell):
+    path = []
+    while cell is not None:
+        path.append(cell)
+        cell = parents[cell]
+    return path[::-1]
+
 # Expand current node: explore neighbors, update frontier and parent mappings
-def expand_node(current_node, open_set, visited, parents, open_dict, obstacles, goal):
+# (an optional tracer sees each push and the close of the expansion; push is the heap push to use)
+def expand_node(current_node, open_set, visited, parents, open_dict, grid, goal, tracer=None, push=heapq.heappush):
     new_frontier = []
-    neighbors = get_neighbors(current_node.position)
+    neighbors = get_neighbors(current_node.position, grid)  # Obstacles and borders are already excluded
 
     for neighbor in neighbors:
-        if neighbor in obstacles or neighbor in visited:
-            continue  # Skip if already visited or an obstacle
+        if neighbor in visited:
+            continue  # Skip if already visited
 
         tentative_g = current_node.g + 1  # Assume uniform cost of 1 for each move
 
         # Check if this path to neighbor is better than any previous one
         if neighbor not in open_dict or tentative_g < open_dict[neighbor]:
             neighbor_node = Node(neighbor, tentative_g, heuristic(neighbor, goal), current_node)
-            heapq.heappush(open_set, neighbor_node)     # Add to priority queue
+            push(open_set, neighbor_node)               # Add to priority queue
             open_dict[neighbor] = tentative_g           # Record best known cost
             parents[neighbor] = current_node.position    # Record parent for path reconstruction
             new_frontier.append(neighbor)               # Track newly added frontier nodes
+            if tracer is not None:
+                tracer.on_push(neighbor, neighbor_node.f)
 
     visited.add(current_node.position)  # Mark current as visited
+    if tracer is not None:
+        tracer.on_close(current_node.position)
     return new_frontier
 
+# Result of a headless search: solution path, its cost and search effort counters
+SearchResult = namedtuple('SearchResult', ['path', 'cost', 'expanded', 'pushed'])
+
+# Run A* to completion without the GUI loop or any printing
+# grid is a Grid, which carries its own dimensions; returns a SearchResult (empty path and None cost if unreachable).
+# heuristic is an optional factory from heuristics.py (or any (grid, target) -> h(cell index) function)
+# giving admissible, consistent estimates; by default the Manhattan distance is computed inline.
+# With jps=True the search runs as Jump Point Search (see solve_jps).
+# tracer is an optional tracing.Tracer that observes the search (expand, push, close and goal events).
+def solve_astar(grid, start, goal, heuristic=None, jps=False, tracer=None):
+    if jps:
+        return solve_jps(grid, start, goal, heuristic, tracer)
+    cells, offsets, stride = grid.cells, grid.offsets, grid.stride
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    goal_row, goal_col = divmod(goal_index, stride)
+
+    open_list = OpenList()
+    best_g = open_list.best_g
+    h = None if heuristic is None else heuristic(grid, goal)
+    estimate = abs(start[0] - goal[0]) + abs(start[1] - goal[1]) if h is None else h(start_index)
+    open_list.push(start_index, 0, estimate)
+    if tracer is not None:
+        tracer.on_push(start, estimate)
+    parents = {start_index: None}
+    expanded = 0
+
+    while True:
+        popped = open_list.pop()
+        if popped is None:
+            return SearchResult([], None, expanded, open_list.counter)
+        index, g = popped
+        expanded += 1
+        if tracer is not None:
+            tracer.on_expand(grid.position(index))
+
+        if index == goal_index:
+            path = [grid.position(i) for i in trace_parents(parents, index)]
+            if tracer is not None:
+                tracer.on_goal(path, g)
+            return SearchResult(path, g, expanded, open_list.counter)
+
+        tentative_g = g + 1  # Uniform cost of 1 for each move
+        for offset in offsets:
+            neighbor = index + offset
+            if cells[neighbor] or tentative_g >= best_g.get(neighbor, tentative_g + 1):
+                continue  # Obstacle, border, closed, or no better than the queued entry
+            if h is None:
+                r, c = divmod(neighbor, stride)
+                estimate = abs(r - goal_row) + abs(c - goal_col)  # Manhattan, as in heuristic()
+            else:
+                estimate = h(neighbor)
+            open_list.push(neighbor, tentative_g, estimate)
+            parents[neighbor] = index
+            if tracer is not None:
+                tracer.on_push(grid.position(neighbor), tentative_g + estimate)
+        if tracer is not None:
+            tracer.on_close(grid.position(index))
+
+# Jump Point Search for 4-connected uniform-cost grids: A* over jump points only.
+# Paths are kept canonical (vertical runs may turn sideways anywhere, horizontal runs only where
+# an obstacle forces it), so instead of pushing every neighbor each expansion jumps straight
+# ahead over the cells no optimal path needs to branch from. Same optimal costs as solve_astar,
+# with far fewer heap operations on open grids (wall time is about that of solve_astar there, and
+# lower on mazes). The tracer sees jump points only.
+def solve_jps(grid, start, goal, heuristic=None, tracer=None):
+    cells, stride = grid.cells, grid.stride
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    goal_row, goal_col = divmod(goal_index, stride)
+    h = None if heuristic is None else heuristic(grid, goal)
+
+    # Manhattan distance also measures the cost of a straight jump between two cells
+    def distance(a, b):
+        (ra, ca), (rb, cb) = divmod(a, stride), divmod(b, stride)
+        return abs(ra - rb) + abs(ca - cb)
+
+    def estimate(cell):
+        if h is None:
+            r, c = divmod(cell, stride)
+            return abs(r - goal_row) + abs(c - goal_col)
+        return h(cell)
+
+    jumps = _RowJumps(cells, stride, goal_index)
+    open_list = OpenList()
+    best_g = open_list.best_g
+    open_list.push(start_index, 0, estimate(start_index))
+    if tracer is not None:
+        tracer.on_push(start, estimate(start_index))
+    parents = {start_index: None}
+    expanded = 0
+
+    while True:
+        popped = open_list.pop()
+        if popped is None:
+            return SearchResult([], None, expanded, open_list.counter)
+        index, g = popped
+        expanded += 1
+        if tracer is not None:
+            tracer.on_expand(grid.position(index))
+
+        if index == goal_index:
+            path = [grid.position(i) for i in _fill_jumps(trace_parents(parents, index), stride)]
+            if tracer is not None:
+                tracer.on_goal(path, g)
+            return SearchResult(path, g, expanded, open_list.counter)
+
+        for step in _jps_directions(cells, stride, index, parents[index]):
+            if step in (1, -1):
+                jump = jumps.jump(index, step)
+            else:
+                jump = _jump_vertical(cells, index, step, goal_index, jumps)
+            if jump is None:
+                continue
+            tentative_g = g + distance(index, jump)
+            if tentative_g >= best_g.get(jump, tentative_g + 1):
+                continue  # Closed, or no better than the queued entry
+            h_jump = estimate(jump)
+            open_list.push(jump, tentative_g, h_jump)
+            parents[jump] = index
+            if tracer is not None:
+                tracer.on_push(grid.position(jump), tentative_g + h_jump)
+        if tracer is not None:
+            tracer.on_close(grid.position(index))
+
+# Directions worth jumping in from a cell, given the jump point it was reached from
+def _jps_directions(cells, stride, index, parent):
+    if parent is None:
+        return (-stride, stride, -1, 1)  # The start looks everywhere
+    delta = index - parent
+    if abs(delta) >= stride:
+        return (stride if delta > 0 else -stride, -1, 1)  # Vertical: ahead and both sides
+    step = 1 if delta > 0 else -1
+    directions = [step]
+    # Horizontal: ahead, plus up or down only where the cell behind had a wall there (forced)
+    for side in (-stride, stride):
+        if not cells[index + side] and cells[index - step + side]:
+            directions.append(side)
+    return directions
+
+# Sideways jumps for solve_jps. A sideways jump stops at the first cell that is a wall (no jump
+# point), the goal, or has a forced up/down neighbor (a free cell whose counterpart one step back
+# is blocked). Each padded row is turned into bitmasks of those stop cells (bit p = column p of
+# the padded row) the first time a jump touches it, so a jump is a shift and a lowest or highest
+# set bit lookup instead of a cell-by-cell scan. A vertical jump probes both sides of every cell
+# it passes, and scanning those rows one cell at a time made it cost O(area).
+class _RowJumps:
+    __slots__ = ('cells', 'stride', 'goal_index', 'stops')
+
+    def __init__(self, cells, stride, goal_index):
+        self.cells = cells
+        self.stride = stride
+        self.goal_index = goal_index
+        self.stops = [None] * (len(cells) // stride)  # Padded row -> (right stops, left stops)
+
+    def _free(self, row):
+        start = row * self.stride
+        return int(self.cells[start:start + self.stride].translate(FREE_TO_DIGIT)[::-1], 2)
+
+    def _add_row(self, row):
+        free, up, down = self._free(row), self._free(row - 1), self._free(row + 1)
+        ends = ((1 << self.stride) - 1) ^ free  # Walls, plus the goal below
+        goal_row, goal_col = divmod(self.goal_index, self.stride)
+        if row == goal_row:
+            ends |= 1 << goal_col
+        # Bit p of up << 1 is the cell above p - 1, i.e. above the cell behind p on a jump to the right
+        stops = self.stops[row] = (ends | (free & ((up & ~(up << 1)) | (down & ~(down << 1)))),
+                                   ends | (free & ((up & ~(up >> 1)) | (down & ~(down >> 1)))))
+        return stops
+
+    # Jump sideways (step 1 or -1) from index: the stop cell's index, or None when it is a wall
+    def jump(self, index, step):
+        cells = self.cells
+        if cells[index + step]:
+            return None  # Walled in on that side, the common case in mazes
+        row, col = divmod(index, self.stride)
+        stops = self.stops[row]
+        if stops is None:
+            stops = self._add_row(row)
+        if step > 0:
+            ahead = stops[0] >> (col + 1)
+            index += (ahead & -ahead).bit_length()  # Lowest set bit; the border guarantees one
+        else:
+            index += (stops[1] & ((1 << col) - 1)).bit_length() - 1 - col  # Highest set bit below col
+        return None if cells[index] else index
+
+# Jump up or down from index: the first cell that is the goal or from which a sideways jump
+# finds a jump point, or None when a wall is hit first
+def _jump_vertical(cells, index, step, goal_index, jumps):
+    while True:
+        index += step
+        if cells[index]:
+            return None
+        if index == goal_index or jumps.jump(index, 1) is not None or jumps.jump(index, -1) is not None:
+            return index
+
+# Expand a list of jump points (each in a straight line from the last) into every cell in between
+def _fill_jumps(jump_points, stride):
+    path = jump_points[:1]
+    for target in jump_points[1:]:
+        index = path[-1]
+        delta = target - index
+        step = (stride if delta > 0 else -stride) if abs(delta) >= stride else (1 if delta > 0 else -1)
+        while index != target:
+            index += step
+            path.append(index)
+    return path
+
 # Utility function to print a path in readable format
 def print_path(label, path):
     print(f"{label}: [{' -> '.join(str(p) for p in path)}]")
@@ -1,162 +1,370 @@
 # backward_Chaining.py
 
-import pygame
-import sys
-from constants import ROWS, COLS, CELL_SIZE, WINDOW_HEIGHT, start, goal, DEFAULT_OBSTACLES, moves, NUM_OBSTACLES
-from visualisation import draw_grid_backward_chaining, draw_buttons
-from maze import generate_random_obstacles
+import re
+from collections import namedtuple
+from a_star import SearchResult
 
-# Utility to convert a grid position into a logical fact string
+# Utility to convert a grid position into a logical fact string (for display)
 def at_fact(pos):
     return f"At{pos}"
 
-# Generate backward chaining rules based on the grid and obstacle layout
-def generate_backward_rules(rows, cols, obstacles):
-    rules = []
-    for r in range(rows):
-        for c in range(cols):
-            if (r, c) in obstacles:
-                continue
-            current = (r, c)
-            for dr, dc in moves:
-                neighbor = (r + dr, c + dc)
-                if (0 <= neighbor[0] < rows and 0 <= neighbor[1] < cols and neighbor not in obstacles):
-                    rules.append({
-                        'conclusion': at_fact(current),
-                        'premises': [at_fact(neighbor)]
-                    })
-    return rules
-
-# Backward chaining inference engine
-def backward_chain(goal_fact, facts, rules, trace=None, visited=None, path=None):
+# Structured fact: the agent can be at (row, col). Prints as At(r, c), like at_fact.
+class At(namedtuple('At', ['row', 'col'])):
+    __slots__ = ()
+
+    def __str__(self):
+        return f"At({self.row}, {self.col})"
+
+    __repr__ = __str__
+
+# Inference rule over fact IDs: conclusion holds if every premise holds
+Rule = namedtuple('Rule', ['conclusion', 'premises'])
+
+_FACT_PATTERN = re.compile(r"\s*At\s*\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)\s*$")
+
+# Parse a fact written as 'At(r, c)' (e.g. from a rule file) without eval
+def parse_fact(text):
+    match = _FACT_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Not a fact of the form At(row, col): {text!r}")
+    return At(int(match.group(1)), int(match.group(2)))
+
+# Parse a rule written as 'At(r, c) <- At(r2, c2), ...' into a Rule over interned IDs
+def parse_rule(text, symbols):
+    conclusion, arrow, premises = text.partition('<-')
+    if not arrow:
+        raise ValueError(f"Rule is missing '<-': {text!r}")
+    premise_facts = re.findall(r"At\s*\([^)]*\)", premises)
+    return Rule(symbols.intern(parse_fact(conclusion)),
+                tuple(symbols.intern(parse_fact(p)) for p in premise_facts))
+
+
+# Symbol table interning facts as dense integer IDs. The engine only handles the IDs
+# (cheap to hash and compare); facts and names are looked up here when needed for output.
+class SymbolTable:
+    def __init__(self):
+        self.ids = {}
+        self.facts = []
+
+    # ID of a fact (an At or a plain (row, col) position), assigning the next ID if it is new
+    def intern(self, fact):
+        fact_id = self.ids.get(fact)
+        if fact_id is None:
+            fact_id = self.ids[fact] = len(self.facts)
+            self.facts.append(At(*fact))
+        return fact_id
+
+    # (row, col) position of a fact ID
+    def position(self, fact_id):
+        fact = self.facts[fact_id]
+        return fact.row, fact.col
+
+    # Display name of a fact ID, e.g. 'At(3, 4)'
+    def name(self, fact_id):
+        return str(self.facts[fact_id])
+
+    def __len__(self):
+        return len(self.facts)
+
+
+# Rule base indexed by conclusion: the rules in generation order plus a dict from each
+# conclusion to its rules, so the engine can look up applicable rules instead of scanning them all
+class RuleBase:
+    def __init__(self, rules=(), symbols=None):
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.rules = []
+        self.by_conclusion = {}
+        for rule in rules:
+            self.add(rule)
+
+    # Add a rule and index it under its conclusion
+    def add(self, rule):
+        self.rules.append(rule)
+        self.by_conclusion.setdefault(rule.conclusion, []).append(rule)
+
+    # Rules that conclude the given fact ID, in the order they were added
+    def rules_for(self, conclusion):
+        return self.by_conclusion.get(conclusion, [])
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+# Lazy rule provider: derives At(cell) <- At(neighbor) for the free neighbors of a free cell
+# from the grid only when the engine asks for a goal's rules. Only the facts the engine reaches
+# are interned, so memory grows with the explored region instead of the whole maze.
+class GridRules:
+    def __init__(self, grid, symbols=None):
+        self.grid = grid
+        self.symbols = symbols if symbols is not None else SymbolTable()
+
+    # Rules that conclude the given fact ID, in the same order generate_backward_rules adds them
+    def rules_for(self, conclusion):
+        current = self.symbols.position(conclusion)
+        if not self.grid.is_free(current):
+            return []
+        intern = self.symbols.intern
+        return [Rule(conclusion, (intern(neighbor),)) for neighbor in self.grid.neighbors(current)]
+
+    # Every rule, cell by cell (for display); generated as it is iterated
+    def __iter__(self):
+        grid, intern = self.grid, self.symbols.intern
+        for r in range(grid.rows):
+            for c in range(grid.cols):
+                yield from self.rules_for(intern((r, c)))
+
+# Generate backward chaining rules based on the grid and obstacle layout, as an indexed RuleBase
+# (materializes every rule; the engine can also run directly on a GridRules provider)
+def generate_backward_rules(grid):
+    rules = GridRules(grid)
+    return RuleBase(rules, rules.symbols)
+
+# Display form of a rule, e.g. 'At(0, 0) <- At(1, 0)'
+def format_rule(rule, symbols):
+    return f"{symbols.name(rule.conclusion)} <- {', '.join(map(symbols.name, rule.premises))}"
+
+
+# Trace events: the engine records (event, fact ID or Rule) tuples and format_trace turns them
+# into text only when someone reads the trace
+KNOWN, FAILED_BEFORE, TRYING, NO_RULES, FOUND_RULE, FAILED, SUCCEEDED, ALL_FAILED = range(8)
+
+# Render a trace as the engine's human-readable lines
+def format_trace(trace, symbols):
+    name = symbols.name
+    lines = []
+    for event, item in trace:
+        if event == KNOWN:
+            lines.append(f"Fact already known: {name(item)}")
+        elif event == FAILED_BEFORE:
+            lines.append(f"Already attempted and failed: {name(item)}")
+        elif event == TRYING:
+            lines.append(f"Trying to prove: {name(item)}")
+        elif event == NO_RULES:
+            lines.append(f"No rules lead to: {name(item)}")
+        elif event == FOUND_RULE:
+            lines.append(f"Found rule: {name(item.conclusion)} <- {[name(p) for p in item.premises]}")
+        elif event == FAILED:
+            lines.append(f"Failed to prove: {name(item)}")
+        elif event == SUCCEEDED:
+            lines.append(f"Rule succeeded:{[name(p) for p in item.premises]} <- {name(item.conclusion)} ")
+        elif event == ALL_FAILED:
+            lines.append(f"All rules failed for: {name(item)}")
+    return lines
+
+# A goal whose rules are being tried, in place of one recursive call of the engine
+class _Frame:
+    __slots__ = ('goal', 'rules', 'rule_index', 'premise_index', 'path', 'caller_path')
+
+    def __init__(self, goal, rules, caller_path):
+        self.goal = goal
+        self.rules = rules              # Applicable rules for the goal
+        self.rule_index = 0             # Rule being tried
+        self.premise_index = 0          # Next premise of that rule to prove
+        self.path = []                  # Path built by the rule being tried
+        self.caller_path = caller_path  # Path handed in by the parent, returned if every rule fails
+
+# Backward chaining inference engine over fact IDs
+# rules is a RuleBase or a GridRules provider; the returned path holds (row, col) positions decoded through its symbol table.
+# The goal stack is explicit rather than recursive, so proof depth is not limited by Python's
+# recursion limit; the trace and path are the same as a depth-first recursive prover would give.
+# failed is an optional set of facts already known to be unprovable, read like visited but never written.
+def backward_chain(goal_fact, facts, rules, trace=None, visited=None, path=None, failed=()):
     if trace is None:
         trace = []
     if visited is None:
         visited = set()
     if path is None:
         path = []
+    position = rules.symbols.position
+
+    stack = []
+    goal = goal_fact
+    while True:
+        # Start proving goal, extending path. proved stays None while a new frame has premises to prove
+        proved = None
+        if goal in facts:
+            # Goal is already known
+            trace.append((KNOWN, goal))
+            path.append(position(goal))
+            proved = True
+        elif goal in visited or goal in failed:
+            # Avoid infinite loops and facts that failed before
+            trace.append((FAILED_BEFORE, goal))
+            proved = False
+        else:
+            visited.add(goal)
+            trace.append((TRYING, goal))
+            # Find all rules that conclude this goal
+            applicable_rules = rules.rules_for(goal)
+            if applicable_rules:
+                trace.append((FOUND_RULE, applicable_rules[0]))
+                stack.append(_Frame(goal, applicable_rules, path))
+            else:
+                trace.append((NO_RULES, goal))
+                proved = False
+
+        # Hand results back down the stack until a frame has another premise to prove
+        while True:
+            if proved is None:
+                frame = stack[-1]
+                rule = frame.rules[frame.rule_index]
+                if frame.premise_index < len(rule.premises):
+                    goal, path = rule.premises[frame.premise_index], frame.path
+                    break
+                # Every premise of the rule holds
+                trace.append((SUCCEEDED, rule))
+                facts.add(frame.goal)
+                frame.path.append(position(frame.goal))  # Add current goal to path
+                stack.pop()
+                proved, path = True, frame.path
+                continue
+
+            if not stack:
+                return proved, trace, path
+            frame = stack[-1]
+            if proved:
+                frame.path = path
+                frame.premise_index += 1
+                proved = None
+                continue
+
+            # A premise failed: move on to the goal's next rule
+            rule = frame.rules[frame.rule_index]
+            trace.append((FAILED, rule.premises[frame.premise_index]))
+            frame.rule_index += 1
+            if frame.rule_index < len(frame.rules):
+                trace.append((FOUND_RULE, frame.rules[frame.rule_index]))
+                frame.premise_index = 0
+                frame.path = []
+                proved = None
+            else:
+                trace.append((ALL_FAILED, frame.goal))
+                stack.pop()
+                path = frame.caller_path
+
+# Setup and run the inference engine on a maze, then return the final path.
+# With verbose, print every rule and the trace; listing the rules enumerates the whole grid.
+def run_inference(maze, verbose=True):
+    rules = GridRules(maze.grid)
+    symbols = rules.symbols
+    initial_facts = {symbols.intern(maze.goal)}  # Start from the goal
 
-    # Goal is already known
-    if goal_fact in facts:
-        trace.append(f"Fact already known: {goal_fact}")
-        path.append(eval(goal_fact[2:]))  # Convert 'At(r, c)' string back to tuple
-        return True, trace, path
-
-    # Avoid infinite loops
-    if goal_fact in visited:
-        trace.append(f"Already attempted and failed: {goal_fact}")
-        return False, trace, path
-
-    visited.add(goal_fact)
-    trace.append(f"Trying to prove: {goal_fact}")
-
-    # Find all rules that conclude this goal
-    applicable_rules = [r for r in rules if r['conclusion'] == goal_fact]
-    if not applicable_rules:
-        trace.append(f"No rules lead to: {goal_fact}")
-        return False, trace, path
-
-    # Try each rule
-    for rule in applicable_rules:
-        trace.append(f"Found rule: {rule['conclusion']} <- {rule['premises']}")
-        temp_path = []
-        all_premises_true = True
-
-        # Recursively attempt to prove all premises
-        for premise in rule['premises']:
-            result, trace, temp_path = backward_chain(premise, facts, rules, trace, visited, temp_path)
-            if not result:
-                trace.append(f"Failed to prove: {premise}")
-                all_premises_true = False
-                break
-
-        if all_premises_true:
-            trace.append(f"Rule succeeded:{rule['premises']} <- {rule['conclusion']} ")
-            facts.add(goal_fact)
-            temp_path.append(eval(goal_fact[2:]))  # Add current goal to path
-            return True, trace, temp_path
-
-    trace.append(f"All rules failed for: {goal_fact}")
-    return False, trace, path
-
-# Setup and run the inference engine, then return the final path
-def run_inference(obstacles):
-    initial_facts = {at_fact(goal)}  # Start from the goal
-    rules = generate_backward_rules(ROWS, COLS, obstacles)
-
-    print("\nFull Inference Rules")
-    for rule in rules:
-        print(f"{rule['conclusion']} <- {', '.join(rule['premises'])}")
-
-    goal_fact = at_fact(start)  # Try to prove we're at the start
+    if verbose:
+        print("\nFull Inference Rules")
+        for rule in rules:
+            print(format_rule(rule, symbols))
+
+    goal_fact = symbols.intern(maze.start)  # Try to prove we're at the start
     success, trace, path = backward_chain(goal_fact, initial_facts, rules)
 
-    print("\n--- Trace ---")
-    for step in trace:
-        print(step)
+    if verbose:
+        print("\n--- Trace ---")
+        for step in format_trace(trace, symbols):
+            print(step)
 
     return path
 
-# Pygame GUI to visualize backward chaining step-by-step
-def main():
-    print("Backward-Chaining Maze Solver")
-    pygame.init()
-    screen = pygame.display.set_mode((COLS * CELL_SIZE, WINDOW_HEIGHT))
-    pygame.display.set_caption("Backward-Chaining Path Visualization")
-    clock = pygame.time.Clock()
-
-    current_obstacles = DEFAULT_OBSTACLES.copy()
-    full_path = run_inference(current_obstacles)
-    step_index = 1  # For stepping through the path
-    rule_display_map = {}  # Visual mapping of applied rules
-
-    running = True
-    while running:
-        screen.fill((220, 220, 220))
-        current_path = full_path[:step_index]  # Current visible path
-
-        draw_grid_backward_chaining(screen, set(), set(), [], [], current_path, {}, current_obstacles, rule_display_map)
-        step_rect, back_rect, rand_rect, def_rect = draw_buttons(screen)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if step_rect.collidepoint(event.pos):
-                    if step_index < len(full_path):
-                        if step_index > 0:
-                            from_pos = full_path[step_index - 1]
-                            to_pos = full_path[step_index]
-                            rule_text = f"{at_fact(from_pos)} <- {at_fact(to_pos)}"
-                            rule_display_map[to_pos] = [rule_text]
-                        step_index += 1
-
-                elif back_rect.collidepoint(event.pos):
-                    if step_index > 1:
-                        removed_pos = full_path[step_index - 1]
-                        rule_display_map.pop(removed_pos, None)
-                        step_index -= 1
-
-                elif rand_rect.collidepoint(event.pos):
-                    current_obstacles = generate_random_obstacles(start, goal, ROWS, COLS, NUM_OBSTACLES)
-                    full_path = run_inference(current_obstacles)
-                    step_index = 1
-                    rule_display_map = {}
-                    print("Randomized maze generated.")
-
-                elif def_rect.collidepoint(event.pos):
-                    current_obstacles = DEFAULT_OBSTACLES.copy()
-                    full_path = run_inference(current_obstacles)
-                    step_index = 1
-                    rule_display_map = {}
-                    print("Default maze loaded.")
-
-        pygame.display.update()
-        clock.tick(30)
-
-    pygame.quit()
-    sys.exit()
+# Headless entry point: prove At(start) from At(goal) without printing and return a SearchResult
+# (path ordered start -> goal, expanded = facts attempted, pushed = rules tried)
+def solve_backward_chaining(grid, start, goal):
+    rules = GridRules(grid)
+    symbols = rules.symbols
+    visited = set()
+    success, trace, path = backward_chain(symbols.intern(start), {symbols.intern(goal)}, rules, visited=visited)
+    rules_tried = sum(1 for event, _ in trace if event == FOUND_RULE)
+    if not success:
+        return SearchResult([], None, len(visited), rules_tried)
+    path = path[::-1]  # The engine builds the path from the goal back to the start
+    return SearchResult(path, len(path) - 1, len(visited), rules_tried)
+
+# Per-maze tabling for backward chaining: proofs and failures are kept across queries to the same
+# goal. Every proven fact stores the next cell of its proof (a pointer towards the goal) and every
+# failed fact is remembered, so a later query stops as soon as it reaches either one. Asking about
+# every cell of a maze then costs about one traversal in total instead of one per cell.
+# Change cells through set_blocked so the caches are invalidated: blocking a cell can break
+# proofs, freeing one can turn failures into successes.
+class ProofCache:
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = goal
+        self.rules = GridRules(grid)
+        self.symbols = self.rules.symbols
+        self.goal_fact = self.symbols.intern(goal)
+        self.proven = {self.goal_fact}  # Fact IDs known to hold
+        self.next = {}                  # Proven fact ID -> next fact ID on its way to the goal
+        self.failed = set()             # Fact IDs that cannot be proven
+
+    # Block or free a cell and drop the cached results it may invalidate
+    def set_blocked(self, pos, blocked=True):
+        if blocked == (pos in self.grid):
+            return
+        self.grid.set_blocked(pos, blocked)
+        if blocked:
+            self.proven = {self.goal_fact}
+            self.next = {}
+        else:
+            self.failed = set()
+
+    # Prove At(start), reusing and extending the caches; returns (success, trace, number of facts attempted)
+    def _prove(self, start):
+        fact = self.symbols.intern(start)
+        if fact in self.proven:
+            return True, [(KNOWN, fact)], 0
+        if fact in self.failed:
+            return False, [(FAILED_BEFORE, fact)], 0
+        attempted = set()
+        success, trace, path = backward_chain(fact, self.proven, self.rules, visited=attempted, failed=self.failed)
+        if not success:
+            # The engine only fails after exhausting everything reachable from start
+            self.failed |= attempted
+            return False, trace, len(attempted)
+
+        # The path runs from a proven fact back to start: each cell points to the one before it
+        intern = self.symbols.intern
+        ids = [intern(pos) for pos in path]
+        for previous, current in zip(ids, ids[1:]):
+            self.next[current] = previous
+        # The other facts attempted are connected to that path, so point them at proven neighbours
+        frontier = ids
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self.grid.neighbors(self.symbols.position(current)):
+                    neighbor = intern(neighbor)
+                    if neighbor in attempted and neighbor not in self.proven:
+                        self.proven.add(neighbor)
+                        self.next[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return True, trace, len(attempted)
+
+    # Check whether the goal can be reached from pos
+    def can_reach(self, pos):
+        return self._prove(pos)[0]
+
+    # Path from start to the goal following the cached proof pointers, or [] if there is none
+    def path(self, start):
+        if not self._prove(start)[0]:
+            return []
+        fact = self.symbols.intern(start)
+        path = [start]
+        while fact != self.goal_fact:
+            fact = self.next[fact]
+            path.append(self.symbols.position(fact))
+        return path
+
+    # Headless query like solve_backward_chaining (expanded = facts attempted by this query,
+    # pushed = rules tried by this query)
+    def solve(self, start):
+        success, trace, attempted = self._prove(start)
+        rules_tried = sum(1 for event, _ in trace if event == FOUND_RULE)
+        if not success:
+            return SearchResult([], None, attempted, rules_tried)
+        path = self.path(start)
+        return SearchResult(path, len(path) - 1, attempted, rules_tried)
 
 if __name__ == "__main__":
+    from main_backward_Chaining import main  # The GUI lives in its own module so the engine stays pygame-free
     main()
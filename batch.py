@@ -0,0 +1,149 @@
+# Batch maze solving across a process pool
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from grid import Grid
+from maze import Maze
+from maze_file import MazeFile
+from a_star import solve_astar, solve_jps
+from bidirectional_Greedy import solve_bidirectional_greedy, solve_bidirectional_astar
+from backward_Chaining import solve_backward_chaining
+
+# Headless solvers by name; each takes (grid, start, goal) and returns a SearchResult
+SOLVERS = {
+    'astar': solve_astar,
+    'jps': solve_jps,
+    'bidirectional_greedy': solve_bidirectional_greedy,
+    'bidirectional_astar': solve_bidirectional_astar,
+    'backward_chaining': solve_backward_chaining,
+}
+
+# One solved maze: its position in the input, the SearchResult and the solve time in seconds
+BatchResult = namedtuple('BatchResult', ['index', 'result', 'seconds'])
+
+
+# Encode a maze as plain values plus the grid's raw cell bytes, which pickle as one buffer
+def encode_maze(maze):
+    return maze.rows, maze.cols, maze.start, maze.goal, bytes(maze.grid.cells)
+
+# Rebuild a Maze from encode_maze output
+def decode_maze(encoded):
+    rows, cols, start, goal, cells = encoded
+    return Maze(Grid.from_cells(rows, cols, cells), start, goal)
+
+
+# Solve one maze with the named solver and time it
+def solve_one(maze, algorithm='astar'):
+    solver = get_solver(algorithm)
+    started = time.perf_counter()
+    result = solver(maze.grid, maze.start, maze.goal)
+    return result, time.perf_counter() - started
+
+# Look up a solver by name
+def get_solver(algorithm):
+    if algorithm not in SOLVERS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}; expected one of {sorted(SOLVERS)}")
+    return SOLVERS[algorithm]
+
+
+# Worker entry point: decode and solve a chunk of (index, encoded maze) pairs
+def _solve_chunk(algorithm, chunk):
+    results = []
+    for index, encoded in chunk:
+        result, seconds = solve_one(decode_maze(encoded), algorithm)
+        results.append(BatchResult(index, result, seconds))
+    return results
+
+# Group an iterable of mazes into lists of (index, encoded maze) pairs
+def _chunks(mazes, chunksize):
+    chunk = []
+    for index, maze in enumerate(mazes):
+        chunk.append((index, encode_maze(maze)))
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Solve many mazes with one algorithm across a process pool, yielding BatchResults in completion order.
+# mazes may be any iterable (it is consumed lazily, with at most max_pending chunks in flight);
+# workers defaults to the CPU count and workers <= 1 solves in this process without a pool.
+def solve_many(mazes, algorithm='astar', workers=None, chunksize=64, max_pending=None):
+    get_solver(algorithm)  # Fail fast on a bad name, before any work is submitted
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1:
+        for index, maze in enumerate(mazes):
+            result, seconds = solve_one(maze, algorithm)
+            yield BatchResult(index, result, seconds)
+        return
+
+    calls = ((_solve_chunk, algorithm, chunk) for chunk in _chunks(mazes, chunksize))
+    yield from _run_pool(calls, workers, max_pending or workers * 4)
+
+
+# Worker entry point for solve_file: solve the mazes at the given indices of a maze file.
+# Each worker process maps the file once and decodes every maze into the same grid buffer
+# when the dimensions repeat, so only the indices cross the process boundary.
+def _solve_file_chunk(path, algorithm, indices):
+    maze_file = _open_files.get(path)
+    if maze_file is None:
+        maze_file = _open_files[path] = MazeFile(path)
+    return list(_solve_indices(maze_file, algorithm, indices))
+
+_open_files = {}  # Path -> MazeFile, per worker process
+
+def _solve_indices(maze_file, algorithm, indices):
+    grid = None
+    for index in indices:
+        maze = maze_file.load(index, grid)
+        grid = maze.grid
+        result, seconds = solve_one(maze, algorithm)
+        yield BatchResult(index, result, seconds)
+
+
+# Solve mazes stored in a maze file (see maze_file.py) with one algorithm across a process pool,
+# yielding BatchResults (indexed by position in the file) in completion order. indices selects
+# which mazes to solve (default all); workers and max_pending are as in solve_many.
+def solve_file(path, algorithm='astar', indices=None, workers=None, chunksize=64, max_pending=None):
+    get_solver(algorithm)
+    workers = workers or os.cpu_count() or 1
+    if indices is None:
+        with MazeFile(path) as maze_file:
+            indices = range(len(maze_file))
+
+    if workers <= 1:
+        with MazeFile(path) as maze_file:
+            yield from _solve_indices(maze_file, algorithm, indices)
+        return
+
+    # Slices of a range pickle as three integers, however many mazes they cover
+    chunks = (indices[i:i + chunksize] for i in range(0, len(indices), chunksize))
+    calls = ((_solve_file_chunk, path, algorithm, chunk) for chunk in chunks)
+    yield from _run_pool(calls, workers, max_pending or workers * 4)
+
+
+# Run (function, *args) calls on a process pool, at most max_pending at a time, and yield
+# the items of every list they return, in completion order
+def _run_pool(calls, workers, max_pending):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while True:
+            # Keep the pool fed without materializing the whole input
+            while not exhausted and len(pending) < max_pending:
+                call = next(calls, None)
+                if call is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(*call))
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
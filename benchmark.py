@@ -0,0 +1,197 @@
+# Benchmark suite: every headless solver over seeded maze corpora, from the command line
+#
+#   python benchmark.py --sizes 21 41 --densities 0.2 0.35 --output results.csv
+#   python benchmark.py --output new.json --baseline results.json   # regression check
+#
+# For every generator, size, density and seed a maze is generated (the same maze every run),
+# each solver is timed on it (best of --repeat runs), run once more under tracemalloc for its
+# peak memory, and its path length is checked against the BFS optimum. Results go to CSV or JSON
+# (by file extension); with --baseline the run is compared against a saved result file and the
+# exit status is 1 if any solver got slower, used more memory or work, or lost optimality.
+
+import argparse
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+from maze import GENERATORS, make_maze
+from reachability import distance_field, UNREACHABLE
+from batch import SOLVERS
+
+# Columns of a result row
+FIELDS = ['generator', 'rows', 'cols', 'density', 'seed', 'solver', 'seconds', 'expanded', 'pushed',
+          'peak_bytes', 'path_length', 'optimal_length', 'optimal']
+
+# Columns identifying a benchmark case (matched between a run and its baseline)
+KEY_FIELDS = ('generator', 'rows', 'cols', 'density', 'seed', 'solver')
+
+# Effort counters compared exactly against a baseline: any increase is a regression
+EXACT_FIELDS = ('expanded', 'pushed')
+
+DEFAULT_SIZES = (21, 41)
+DEFAULT_DENSITIES = (0.2, 0.35)
+
+
+# Seeded corpus: yields (generator, size, density, seed, maze) for every combination.
+# A density of None keeps the generator's natural density.
+def corpus(generators, sizes, densities, seeds):
+    for kind in generators:
+        for size in sizes:
+            for density in densities:
+                for seed in range(seeds):
+                    yield kind, size, density, seed, make_maze(kind, size, size, density, rng=seed)
+
+# Best wall time of repeat runs, the solver's result, and its peak traced memory in bytes
+def measure(solver, maze, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = solver(maze.grid, maze.start, maze.goal)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+
+    # Separate run for memory, since tracing slows the solver down
+    tracemalloc.start()
+    try:
+        solver(maze.grid, maze.start, maze.goal)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, result, peak
+
+# Run the whole sweep and return one result row (a dict keyed by FIELDS) per maze and solver
+def run_benchmark(generators, sizes, densities, solvers, seeds=3, repeat=3):
+    rows = []
+    for kind, size, density, seed, maze in corpus(generators, sizes, densities, seeds):
+        optimum = distance_field(maze.grid, maze.goal)[maze.grid.index(maze.start)]
+        optimum = None if optimum == UNREACHABLE else optimum
+        for name in solvers:
+            seconds, result, peak = measure(SOLVERS[name], maze, repeat)
+            rows.append({
+                'generator': kind, 'rows': size, 'cols': size, 'density': density, 'seed': seed,
+                'solver': name, 'seconds': seconds, 'expanded': result.expanded, 'pushed': result.pushed,
+                'peak_bytes': peak, 'path_length': result.cost, 'optimal_length': optimum,
+                'optimal': result.cost == optimum,
+            })
+    return rows
+
+
+# Write result rows to path as JSON or CSV, picked by the file extension
+def save_results(rows, path):
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=1)
+    else:
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+# Read result rows written by save_results (CSV values are converted back to numbers)
+def load_results(path):
+    if path.endswith('.json'):
+        with open(path) as f:
+            return json.load(f)
+    with open(path, newline='') as f:
+        return [_parse_row(row) for row in csv.DictReader(f)]
+
+def _parse_row(row):
+    parsed = {}
+    for field, value in row.items():
+        if field in ('generator', 'solver'):
+            parsed[field] = value
+        elif field == 'optimal':
+            parsed[field] = value == 'True'
+        elif value == '':
+            parsed[field] = None
+        elif field in ('density', 'seconds'):
+            parsed[field] = float(value)
+        else:
+            parsed[field] = int(value)
+    return parsed
+
+
+# Compare a run against a baseline and return one message per regression. Time and peak memory
+# may grow by the tolerance fraction (timings under min_seconds are too noisy to compare);
+# expanded and pushed counts must not grow at all, and an optimal path must stay optimal.
+def find_regressions(rows, baseline, tolerance=0.25, min_seconds=0.005):
+    previous = {tuple(row[k] for k in KEY_FIELDS): row for row in baseline}
+    regressions = []
+    for row in rows:
+        key = tuple(row[k] for k in KEY_FIELDS)
+        old = previous.get(key)
+        if old is None:
+            continue  # New case, nothing to compare against
+        label = ' '.join(f"{k}={v}" for k, v in zip(KEY_FIELDS, key))
+        if old['seconds'] >= min_seconds and row['seconds'] > old['seconds'] * (1 + tolerance):
+            regressions.append(f"{label}: time {old['seconds']:.4f}s -> {row['seconds']:.4f}s")
+        if row['peak_bytes'] > old['peak_bytes'] * (1 + tolerance):
+            regressions.append(f"{label}: peak memory {old['peak_bytes']} -> {row['peak_bytes']} bytes")
+        for field in EXACT_FIELDS:
+            if row[field] > old[field]:
+                regressions.append(f"{label}: {field} {old[field]} -> {row[field]}")
+        if old['optimal'] and not row['optimal']:
+            regressions.append(f"{label}: path length {old['path_length']} -> {row['path_length']} (no longer optimal)")
+    return regressions
+
+# Per-solver totals of a run, for the console summary
+def summarize(rows):
+    totals = {}
+    for row in rows:
+        total = totals.setdefault(row['solver'], {'cases': 0, 'seconds': 0.0, 'expanded': 0, 'pushed': 0,
+                                                  'peak_bytes': 0, 'optimal': 0})
+        total['cases'] += 1
+        total['seconds'] += row['seconds']
+        total['expanded'] += row['expanded']
+        total['pushed'] += row['pushed']
+        total['peak_bytes'] = max(total['peak_bytes'], row['peak_bytes'])
+        total['optimal'] += row['optimal']
+    return totals
+
+def print_summary(rows):
+    print(f"{'solver':<22}{'cases':>7}{'seconds':>10}{'expanded':>11}{'pushed':>11}{'max peak KiB':>14}{'optimal':>9}")
+    for name, total in summarize(rows).items():
+        print(f"{name:<22}{total['cases']:>7}{total['seconds']:>10.3f}{total['expanded']:>11}{total['pushed']:>11}"
+              f"{total['peak_bytes'] / 1024:>14.1f}{total['optimal']:>9}")
+
+
+def _density(text):
+    return None if text.lower() == 'none' else float(text)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the maze solvers over seeded maze corpora.")
+    parser.add_argument('--generators', nargs='+', default=sorted(GENERATORS), choices=sorted(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES), help="grid side lengths")
+    parser.add_argument('--densities', nargs='+', type=_density, default=list(DEFAULT_DENSITIES),
+                        help="blocked-cell fractions ('none' keeps a generator's natural density)")
+    parser.add_argument('--solvers', nargs='+', default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument('--seeds', type=int, default=3, help="mazes per combination (seeds 0..N-1)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case (the best one counts)")
+    parser.add_argument('--output', help="write results to this .csv or .json file")
+    parser.add_argument('--baseline', help="compare against a saved .csv or .json result file")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed fractional growth in time and peak memory against the baseline")
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help="baseline timings below this are too noisy to compare")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    rows = run_benchmark(args.generators, args.sizes, args.densities, args.solvers, args.seeds, args.repeat)
+    print_summary(rows)
+    if args.output:
+        save_results(rows, args.output)
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        regressions = find_regressions(rows, load_results(args.baseline), args.tolerance, args.min_seconds)
+        for message in regressions:
+            print("REGRESSION", message)
+        print(f"{len(regressions)} regressions against {args.baseline}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import heapq
-from constants import moves, ROWS, COLS
+from a_star import SearchResult
+from heuristics import manhattan
 
 
 # Manhattan distance heuristic
@@ -7,61 +8,194 @@ def heuristic(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-# Bidirectional Greedy Search algorithm
-def bidirectional_greedy(start, goal, obstacles):
-    # Priority queues for Greedy expansion from start and goal
-    queue_start = [(heuristic(start, goal), start)]
-    queue_goal = [(heuristic(goal, start), goal)]
+# Bidirectional Greedy Search algorithm, returning just the path
+# grid is a Grid, which carries its own dimensions
+def bidirectional_greedy(start, goal, grid):
+    return solve_bidirectional_greedy(grid, start, goal).path
 
-    # Visited sets to track explored nodes
-    visited_start = {start}
-    visited_goal = {goal}
+
+# Bidirectional Greedy Search run to completion, returning a SearchResult with effort counters
+# heuristic is a factory from heuristics.py (default Manhattan); each side is guided towards the other's root.
+# tracer is an optional tracing.Tracer; its events carry side='start' or side='goal'.
+def solve_bidirectional_greedy(grid, start, goal, heuristic=manhattan, tracer=None):
+    cells, offsets = grid.cells, grid.offsets
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    to_goal, to_start = heuristic(grid, goal), heuristic(grid, start)
+
+    # Priority queues for Greedy expansion from start and goal (entries hold flat cell indices)
+    queue_start = [(to_goal(start_index), start_index)]
+    queue_goal = [(to_start(goal_index), goal_index)]
+
+    # Visited flags to track explored cells
+    visited_start = bytearray(len(cells))
+    visited_goal = bytearray(len(cells))
+    visited_start[start_index] = 1
+    visited_goal[goal_index] = 1
 
     # Parent mappings for path reconstruction
-    parents_start = {start: None}
-    parents_goal = {goal: None}
+    parents_start = {start_index: None}
+    parents_goal = {goal_index: None}
 
-    # Store heuristic costs (useful for visualization or metrics)
-    h_start = {start: heuristic(start, goal)}
-    h_goal = {goal: heuristic(goal, start)}
+    expanded = 0
+    pushed = 2
+    if tracer is not None:
+        tracer.on_push(start, queue_start[0][0], 'start')
+        tracer.on_push(goal, queue_goal[0][0], 'goal')
 
     # Continue as long as there are nodes to explore in both queues
     while queue_start and queue_goal:
         # Expand one node from the start side
         if queue_start:
             _, current = heapq.heappop(queue_start)
-            for move in moves:
-                neighbor = (current[0] + move[0], current[1] + move[1])
-                if (0 <= neighbor[0] < ROWS and 0 <= neighbor[1] < COLS and
-                        neighbor not in obstacles and neighbor not in visited_start):
-                    visited_start.add(neighbor)
+            expanded += 1
+            if tracer is not None:
+                tracer.on_expand(grid.position(current), 'start')
+            for offset in offsets:
+                neighbor = current + offset
+                if not cells[neighbor] and not visited_start[neighbor]:
+                    visited_start[neighbor] = 1
                     parents_start[neighbor] = current
-                    h = heuristic(neighbor, goal)
-                    h_start[neighbor] = h
+                    h = to_goal(neighbor)
                     heapq.heappush(queue_start, (h, neighbor))
+                    pushed += 1
+                    if tracer is not None:
+                        tracer.on_push(grid.position(neighbor), h, 'start')
 
                     # If this neighbor has already been visited from the goal side, path is found
-                    if neighbor in visited_goal:
-                        return reconstruct_path(parents_start, parents_goal, neighbor)
+                    if visited_goal[neighbor]:
+                        return _meet_result(grid, parents_start, parents_goal, neighbor, expanded, pushed, tracer)
+            if tracer is not None:
+                tracer.on_close(grid.position(current), 'start')
 
         # Expand one node from the goal side
         if queue_goal:
             _, current = heapq.heappop(queue_goal)
-            for move in moves:
-                neighbor = (current[0] + move[0], current[1] + move[1])
-                if (0 <= neighbor[0] < ROWS and 0 <= neighbor[1] < COLS and
-                        neighbor not in obstacles and neighbor not in visited_goal):
-                    visited_goal.add(neighbor)
+            expanded += 1
+            if tracer is not None:
+                tracer.on_expand(grid.position(current), 'goal')
+            for offset in offsets:
+                neighbor = current + offset
+                if not cells[neighbor] and not visited_goal[neighbor]:
+                    visited_goal[neighbor] = 1
                     parents_goal[neighbor] = current
-                    h = heuristic(neighbor, start)
-                    h_goal[neighbor] = h
+                    h = to_start(neighbor)
                     heapq.heappush(queue_goal, (h, neighbor))
+                    pushed += 1
+                    if tracer is not None:
+                        tracer.on_push(grid.position(neighbor), h, 'goal')
 
                     # Check if both searches meet
-                    if neighbor in visited_start:
-                        return reconstruct_path(parents_start, parents_goal, neighbor)
+                    if visited_start[neighbor]:
+                        return _meet_result(grid, parents_start, parents_goal, neighbor, expanded, pushed, tracer)
+            if tracer is not None:
+                tracer.on_close(grid.position(current), 'goal')
+
+    return SearchResult([], None, expanded, pushed)  # Empty path if no connection found
+
+
+# Bidirectional A* (optimal), returning just the path
+def bidirectional_astar(start, goal, grid):
+    return solve_bidirectional_astar(grid, start, goal).path
+
+
+# Bidirectional A* run to completion, returning a SearchResult with an optimal path.
+# It uses the same frontiers as the greedy search (heaps of flat cell indices from both ends and a
+# parents mapping per side), but orders them by f = g + h, expands the smaller frontier, and keeps
+# the best start-goal connection seen so far (mu). Meeting is not the end: the search only stops
+# once the lowest f on either side reaches mu, as no unexplored path can then be shorter.
+# heuristic is a factory from heuristics.py and must be consistent (Manhattan by default).
+# tracer is an optional tracing.Tracer; on_meet fires each time the best connection improves.
+def solve_bidirectional_astar(grid, start, goal, heuristic=manhattan, tracer=None):
+    cells, offsets = grid.cells, grid.offsets
+    start_index, goal_index = grid.index(start), grid.index(goal)
+    to_goal, to_start = heuristic(grid, goal), heuristic(grid, start)
+
+    # Priority queues of (f, h, cell) entries; entries whose g has since improved are skipped on pop
+    h = to_goal(start_index)
+    queue_start = [(h, h, start_index)]
+    h = to_start(goal_index)
+    queue_goal = [(h, h, goal_index)]
+
+    # Best known cost from each side's root, and closed flags per side
+    g_start = {start_index: 0}
+    g_goal = {goal_index: 0}
+    closed_start = bytearray(len(cells))
+    closed_goal = bytearray(len(cells))
 
-    return []  # Return empty path if no connection found
+    # Parent mappings for path reconstruction
+    parents_start = {start_index: None}
+    parents_goal = {goal_index: None}
+
+    # Best connection found so far: its cost (mu) and the cell where the two sides join
+    best, meet = (0, start_index) if start_index == goal_index else (None, None)
+    expanded = 0
+    pushed = 2
+    if tracer is not None:
+        tracer.on_push(start, queue_start[0][0], 'start')
+        tracer.on_push(goal, queue_goal[0][0], 'goal')
+
+    while queue_start and queue_goal:
+        if best is not None and max(queue_start[0][0], queue_goal[0][0]) >= best:
+            break  # Neither side can still improve on the best connection
+
+        # Expand the side with the smaller frontier
+        if len(queue_start) <= len(queue_goal):
+            queue, g_side, g_other, closed, parents, estimate = queue_start, g_start, g_goal, closed_start, parents_start, to_goal
+            side = 'start'
+        else:
+            queue, g_side, g_other, closed, parents, estimate = queue_goal, g_goal, g_start, closed_goal, parents_goal, to_start
+            side = 'goal'
+
+        f, h, current = heapq.heappop(queue)
+        g = f - h
+        if closed[current] or g != g_side[current]:
+            continue  # Stale entry
+        closed[current] = 1
+        expanded += 1
+        if tracer is not None:
+            tracer.on_expand(grid.position(current), side)
+
+        tentative_g = g + 1
+        for offset in offsets:
+            neighbor = current + offset
+            if cells[neighbor] or tentative_g >= g_side.get(neighbor, tentative_g + 1):
+                continue
+            g_side[neighbor] = tentative_g
+            parents[neighbor] = current
+
+            # Reached by the other side too: a start-goal connection through this neighbor
+            if neighbor in g_other:
+                total = tentative_g + g_other[neighbor]
+                if best is None or total < best:
+                    best, meet = total, neighbor
+                    if tracer is not None:
+                        tracer.on_meet(grid.position(neighbor), total)
+
+            h = estimate(neighbor)
+            if best is not None and tentative_g + h >= best:
+                continue  # No path through it can beat the best connection; don't queue it
+            heapq.heappush(queue, (tentative_g + h, h, neighbor))
+            pushed += 1
+            if tracer is not None:
+                tracer.on_push(grid.position(neighbor), tentative_g + h, side)
+        if tracer is not None:
+            tracer.on_close(grid.position(current), side)
+
+    if meet is None:
+        return SearchResult([], None, expanded, pushed)  # Empty path if no connection found
+    path = [grid.position(i) for i in reconstruct_path(parents_start, parents_goal, meet)]
+    if tracer is not None:
+        tracer.on_goal(path, len(path) - 1)
+    return SearchResult(path, len(path) - 1, expanded, pushed)
+
+
+# Build the greedy search's SearchResult for a meeting cell (cell indices converted back to positions)
+def _meet_result(grid, parents_start, parents_goal, meet, expanded, pushed, tracer=None):
+    path = [grid.position(i) for i in reconstruct_path(parents_start, parents_goal, meet)]
+    if tracer is not None:
+        tracer.on_meet(grid.position(meet), len(path) - 1)
+        tracer.on_goal(path, len(path) - 1)
+    return SearchResult(path, len(path) - 1, expanded, pushed)
 
 
 # Reconstruct the final path by combining paths from both search directions
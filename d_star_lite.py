@@ -0,0 +1,144 @@
+# D* Lite: incremental replanning while cells flip between free and blocked
+#
+# The planner searches backwards from the goal and keeps, for every cell, g (its current
+# distance estimate to the goal) and rhs (the one-step lookahead min over neighbors of 1 + g).
+# Cells where the two disagree are queued. When cells change, only they and their neighbors get
+# new rhs values, and the next replan only repairs the region whose distances actually changed,
+# instead of searching the whole maze again. The agent may also move (move_to) between replans.
+
+import heapq
+from array import array
+from a_star import SearchResult
+
+INF = 2 ** 31 - 1  # Distance of cells that cannot reach the goal (largest value an array('i') holds)
+
+
+class DStarLite:
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.start = grid.index(start)
+        self.goal = grid.index(goal)
+        self.last = self.start  # Start position when km was last updated
+        self.km = 0             # Key modifier: how far the heuristic's origin has moved so far
+
+        size = len(grid.cells)
+        self.g = array('i', [INF]) * size
+        self.rhs = array('i', [INF]) * size
+        self.queue = []   # Heap of (k1, k2, cell) entries, stale ones skipped on pop
+        self.queued = {}  # Cell -> its current key, for the cells in the queue
+        self.expanded = self.pushed = 0  # Work counters of the current replan
+
+        self.rhs[self.goal] = 0
+        self._push(self.goal)
+
+    # Manhattan distance from the agent to a cell (the heuristic, measured from the search's far end)
+    def _h(self, cell):
+        r1, c1 = divmod(self.start, self.grid.stride)
+        r2, c2 = divmod(cell, self.grid.stride)
+        return abs(r1 - r2) + abs(c1 - c2)
+
+    def _key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self._h(cell) + self.km, best)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, key + (cell,))
+        self.pushed += 1
+
+    # Smallest live key in the queue (dropping stale entries), or None if it is empty
+    def _top_key(self):
+        queue, queued = self.queue, self.queued
+        while queue:
+            k1, k2, cell = queue[0]
+            if queued.get(cell) == (k1, k2):
+                return k1, k2
+            heapq.heappop(queue)
+        return None
+
+    # Recompute a cell's rhs from its neighbors and (re)queue it if it is now inconsistent
+    def _update_vertex(self, cell):
+        cells, g = self.grid.cells, self.g
+        if cell != self.goal:
+            best = INF
+            if not cells[cell]:
+                for offset in self.grid.offsets:
+                    neighbor = cell + offset
+                    if not cells[neighbor] and g[neighbor] < best:
+                        best = g[neighbor]
+            self.rhs[cell] = best + 1 if best < INF else INF
+        self.queued.pop(cell, None)
+        if g[cell] != self.rhs[cell]:
+            self._push(cell)
+
+    # Process inconsistent cells until the start's distance is settled
+    def _compute_shortest_path(self):
+        cells, offsets, g, rhs = self.grid.cells, self.grid.offsets, self.g, self.rhs
+        start = self.start
+        while True:
+            top = self._top_key()
+            if top is None or (top >= self._key(start) and rhs[start] == g[start]):
+                return
+            k1, k2, cell = heapq.heappop(self.queue)
+            new_key = self._key(cell)
+            if (k1, k2) < new_key:
+                self._push(cell)  # The key grew since it was queued (the agent moved)
+                continue
+            del self.queued[cell]
+            self.expanded += 1
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]  # Overconsistent: the distance got shorter, settle it
+            else:
+                g[cell] = INF  # Underconsistent: the distance got longer, re-derive it and its neighbors
+                self._update_vertex(cell)
+            for offset in offsets:
+                neighbor = cell + offset
+                if not cells[neighbor]:
+                    self._update_vertex(neighbor)
+
+    # Block or free cells: changed holds (position, blocked) pairs (e.g. dict.items()).
+    # Only the changed cells and their neighbors are touched; the next replan repairs the rest.
+    def update_cells(self, changed):
+        grid = self.grid
+        for pos, blocked in changed:
+            if blocked == (pos in grid):
+                continue
+            grid.set_blocked(pos, blocked)
+            cell = grid.index(pos)
+            self._update_vertex(cell)
+            for offset in grid.offsets:
+                neighbor = cell + offset
+                if not grid.cells[neighbor]:
+                    self._update_vertex(neighbor)
+
+    # Move the agent to a new start position (keys already queued stay valid through km)
+    def move_to(self, start):
+        self.start = self.grid.index(start)
+        self.km += self._h(self.last)
+        self.last = self.start
+
+    # Bring the plan up to date and return it as a SearchResult from the current start
+    # (expanded and pushed count only this replan's work)
+    def replan(self):
+        self.expanded = self.pushed = 0
+        self._compute_shortest_path()
+        return SearchResult(self.path(), self.distance(), self.expanded, self.pushed)
+
+    # Distance from the start to the goal as of the last replan, or None if unreachable
+    def distance(self):
+        d = self.g[self.start]
+        return None if d >= INF else d
+
+    # Path from the start to the goal as of the last replan (each step goes to the neighbor
+    # with the smallest g), or [] if unreachable
+    def path(self):
+        if self.g[self.start] >= INF:
+            return []
+        cells, offsets, g = self.grid.cells, self.grid.offsets, self.g
+        cell = self.start
+        path = [cell]
+        while cell != self.goal:
+            cell = min((cell + offset for offset in offsets if not cells[cell + offset]), key=g.__getitem__)
+            path.append(cell)
+        return [self.grid.position(i) for i in path]
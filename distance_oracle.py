@@ -0,0 +1,75 @@
+# Many-to-one distance and path queries on a fixed maze
+#
+# A reverse BFS distance field from a goal answers every "distance from here to that goal" query
+# with one array lookup, and a shortest path by walking down the field (each step goes to a
+# neighbor one closer), so a query costs O(path length) instead of a fresh search. Fields for
+# popular goals are kept in an LRU cache. When a field per goal costs too much memory, the
+# landmark (ALT) mode keeps only a few fields and answers queries with A* guided by them.
+
+from collections import OrderedDict
+from reachability import distance_field, UNREACHABLE
+from a_star import solve_astar
+from heuristics import Landmarks, landmark
+
+# Distance oracle for one maze. By default it caches up to cache_size goal distance fields
+# (least recently used first out). With landmarks=k it instead keeps k landmark fields and
+# runs A* with the landmark heuristic, so memory stays at k fields however many goals are asked.
+# The grid must not change while the oracle is in use.
+class DistanceOracle:
+    def __init__(self, grid, cache_size=16, landmarks=None):
+        self.grid = grid
+        self.cache_size = cache_size
+        self.fields = OrderedDict()  # goal -> distance field, most recently used last
+        self.landmarks = Landmarks(grid, landmarks) if landmarks else None
+
+    # Distance field towards goal, from the cache or computed now
+    def field(self, goal):
+        field = self.fields.get(goal)
+        if field is not None:
+            self.fields.move_to_end(goal)
+            return field
+        field = distance_field(self.grid, goal)
+        if self.cache_size > 0:
+            self.fields[goal] = field
+            if len(self.fields) > self.cache_size:
+                self.fields.popitem(last=False)
+        return field
+
+    # Shortest distance from start to goal, or None if goal cannot be reached
+    def distance(self, start, goal):
+        if self.landmarks is not None:
+            return self._search(start, goal).cost
+        d = self.field(goal)[self.grid.index(start)]
+        return None if d == UNREACHABLE else d
+
+    # A shortest path from start to goal, or [] if goal cannot be reached
+    def path(self, start, goal):
+        if self.landmarks is not None:
+            return self._search(start, goal).path
+        return gradient_path(self.grid, self.field(goal), start)
+
+    def _search(self, start, goal):
+        return solve_astar(self.grid, start, goal, landmark(self.landmarks))
+
+
+# Walk from start down a distance field to its source: at every step move to a neighbor one
+# step closer. Returns the path as positions, or [] if start cannot reach the source.
+def gradient_path(grid, field, start):
+    return [grid.position(i) for i in gradient_cells(grid, field, grid.index(start))]
+
+# gradient_path on flat cell indices: the path from cell index start as a list of cell indices
+def gradient_cells(grid, field, start):
+    d = field[start]
+    if d == UNREACHABLE:
+        return []
+    offsets = grid.offsets
+    index = start
+    path = [index]
+    while d > 0:
+        d -= 1
+        for offset in offsets:
+            if field[index + offset] == d:
+                index += offset
+                break
+        path.append(index)
+    return path
@@ -0,0 +1,370 @@
+# forward_Chaining.py
+#
+# Forward chaining with Generalized Modus Ponens. Rules with variables are compiled into a
+# Rete-style network (alpha memories per premise pattern, hashed join nodes per rule), so a new
+# fact is only joined with the partial matches it can extend. The closure is computed
+# semi-naively from an agenda, and facts can be added or retracted afterwards: retraction uses
+# delete/rederive (DRed), so only the facts that depended on the change are touched.
+
+from collections import namedtuple, deque
+
+# First-order rule: the conclusion holds for every binding of the variables satisfying all premises.
+# Facts and patterns are tuples (predicate, arg, ...); pattern args starting with '?' are variables,
+# e.g. Rule(('At', '?y'), (('At', '?x'), ('Adjacent', '?x', '?y'))).
+Rule = namedtuple('Rule', ['conclusion', 'premises'])
+
+def is_variable(arg):
+    return isinstance(arg, str) and arg.startswith('?')
+
+# Variables of a pattern, in order of first appearance
+def pattern_variables(pattern):
+    variables = []
+    for arg in pattern[1:]:
+        if is_variable(arg) and arg not in variables:
+            variables.append(arg)
+    return variables
+
+# Unify a pattern with a ground fact: extend bindings so the pattern matches the fact, or return None
+def unify(pattern, fact, bindings=None):
+    if len(pattern) != len(fact) or pattern[0] != fact[0]:
+        return None
+    bindings = dict(bindings) if bindings else {}
+    for arg, value in zip(pattern[1:], fact[1:]):
+        if is_variable(arg):
+            if arg not in bindings:
+                bindings[arg] = value
+            elif bindings[arg] != value:
+                return None
+        elif arg != value:
+            return None
+    return bindings
+
+# Instantiate a pattern with variable bindings
+def substitute(pattern, bindings):
+    return tuple(bindings[arg] if is_variable(arg) else arg for arg in pattern)
+
+
+# ---------------------------------------------------------------------------
+# Rete network
+# ---------------------------------------------------------------------------
+
+# Alpha memory: the facts matching one premise pattern on its own, with their bindings
+class AlphaMemory:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.facts = {}   # fact -> bindings of the pattern's variables
+        self.joins = []   # Join nodes that take this memory as their right input
+
+    # Add or remove a fact and pass it on to the joins; returns False if the pattern does not match
+    def activate(self, fact, adding):
+        if adding:
+            bindings = unify(self.pattern, fact)
+            if bindings is None:
+                return False
+            self.facts[fact] = bindings
+        else:
+            bindings = self.facts.pop(fact, None)
+            if bindings is None:
+                return False
+        for join in self.joins:
+            join.right_activate(fact, bindings, adding)
+        return True
+
+# Join node: extends tokens (tuples of facts matching the earlier premises of a rule) with facts of
+# one alpha memory. Both inputs are hashed on the variables they share, so an activation only
+# visits the partners it actually joins with.
+class JoinNode:
+    def __init__(self, alpha, shared, child):
+        self.alpha = alpha
+        self.shared = shared  # Variables bound by earlier premises that this premise also uses
+        self.child = child    # Next JoinNode, or the rule's Production
+        self.tokens = {}      # key -> {token: bindings} (left memory)
+        self.facts = {}       # key -> {fact: bindings} (right memory, indexed for this join)
+
+    def _key(self, bindings):
+        return tuple(bindings[variable] for variable in self.shared)
+
+    # A token reached this join from the earlier premises
+    def left_activate(self, token, bindings, adding):
+        key = self._key(bindings)
+        memory = self.tokens.get(key)
+        if adding == (memory is not None and token in memory):
+            return  # Already known (or already gone): nothing new to propagate
+        if adding:
+            self.tokens.setdefault(key, {})[token] = bindings
+        else:
+            del memory[token]
+            if not memory:
+                del self.tokens[key]
+        for fact, fact_bindings in list(self.facts.get(key, {}).items()):
+            self.child.left_activate(token + (fact,), {**bindings, **fact_bindings}, adding)
+
+    # A fact reached this join from its alpha memory
+    def right_activate(self, fact, bindings, adding):
+        key = self._key(bindings)
+        memory = self.facts.get(key)
+        if adding == (memory is not None and fact in memory):
+            return
+        if adding:
+            self.facts.setdefault(key, {})[fact] = bindings
+        else:
+            del memory[fact]
+            if not memory:
+                del self.facts[key]
+        for token, token_bindings in list(self.tokens.get(key, {}).items()):
+            self.child.left_activate(token + (fact,), {**token_bindings, **bindings}, adding)
+
+# Production node: a complete match of a rule, handed to the engine as support for the conclusion
+class Production:
+    def __init__(self, rule, engine):
+        self.rule = rule
+        self.engine = engine
+
+    def left_activate(self, token, bindings, adding):
+        conclusion = substitute(self.rule.conclusion, bindings)
+        if adding:
+            self.engine._support_added(conclusion, token)
+        else:
+            self.engine._support_removed(conclusion, token)
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+# Forward chaining engine over a fixed rule set and a changing set of base facts.
+#
+# Every fact has a level: 0 for base facts, and for a derived fact one more than the highest
+# level among the facts of the match that first derived it (its semi-naive round). Levels make
+# retraction targeted: a derived fact only has to be over-deleted when it loses all of its
+# matches from strictly lower levels, since those are the only ones that can't depend on it.
+class ForwardChainer:
+    def __init__(self, rules, facts=()):
+        self.rules = list(rules)
+        self.alphas = {}      # pattern -> AlphaMemory (shared by identical premises)
+        self.by_predicate = {}  # (predicate, arity) -> AlphaMemories that may match such facts
+        self.base = set()     # Facts added from outside
+        self.level = {}       # Every known fact -> its level
+        self.support = {}     # Derived fact -> tokens (premise facts) of the matches deriving it
+        self._agenda = deque()  # Facts known but not yet fed to the network, in level order
+        self._overdeleted = None  # Facts over-deleted by the current retraction
+        self._pending = None      # Over-deleted facts not yet retracted from the network
+        for rule in self.rules:
+            self._compile(rule)
+        self.add_facts(facts)
+
+    # Build the alpha memories, join chain and production for one rule
+    def _compile(self, rule):
+        if not rule.premises:
+            raise ValueError(f"Rule needs at least one premise: {rule}")
+        bound = set()
+        for pattern in rule.premises:
+            bound.update(pattern_variables(pattern))
+        unbound = [v for v in pattern_variables(rule.conclusion) if v not in bound]
+        if unbound:
+            raise ValueError(f"Conclusion variables {unbound} do not appear in the premises of {rule}")
+
+        node = Production(rule, self)
+        bound = set()
+        shared_per_premise = []
+        for pattern in rule.premises:
+            shared_per_premise.append(tuple(v for v in pattern_variables(pattern) if v in bound))
+            bound.update(pattern_variables(pattern))
+        # Link the joins back to front so each one knows its child
+        for pattern, shared in reversed(list(zip(rule.premises, shared_per_premise))):
+            node = JoinNode(self._alpha(pattern), shared, node)
+            node.alpha.joins.append(node)
+        node.tokens[()] = {(): {}}  # The first join starts from the empty match
+
+    def _alpha(self, pattern):
+        alpha = self.alphas.get(pattern)
+        if alpha is None:
+            alpha = self.alphas[pattern] = AlphaMemory(pattern)
+            self.by_predicate.setdefault((pattern[0], len(pattern)), []).append(alpha)
+        return alpha
+
+    # Feed one fact into (or out of) the network
+    def _activate(self, fact, adding):
+        for alpha in self.by_predicate.get((fact[0], len(fact)), ()):
+            alpha.activate(fact, adding)
+
+    def _token_level(self, token):
+        return max(self.level[fact] for fact in token)
+
+    # Record a new fact at a level; it is matched against the rules when the agenda reaches it
+    def _derive(self, fact, level):
+        self.level[fact] = level
+        self._agenda.append(fact)
+
+    # Semi-naive evaluation: each fact is joined once, against the facts known before it
+    def _run(self):
+        agenda = self._agenda
+        while agenda:
+            self._activate(agenda.popleft(), True)
+
+    def _support_added(self, conclusion, token):
+        self.support.setdefault(conclusion, set()).add(token)
+        if conclusion not in self.level:
+            self._derive(conclusion, self._token_level(token) + 1)
+
+    def _support_removed(self, conclusion, token):
+        tokens = self.support.get(conclusion)
+        if tokens is None:
+            return
+        tokens.discard(token)
+        overdeleted = self._overdeleted
+        if overdeleted is None or conclusion in overdeleted or conclusion in self.base or conclusion not in self.level:
+            return
+        level = self.level[conclusion]
+        if not any(self._token_level(t) < level for t in tokens):
+            self._schedule_overdelete(conclusion)
+
+    # Delete phase of DRed: mark a fact for retraction. Facts are retracted one at a time from
+    # _pending (not recursively), so long chains of dependent facts can't exhaust the stack.
+    def _schedule_overdelete(self, fact):
+        self._overdeleted.add(fact)
+        self._pending.append(fact)
+
+    # Add base facts and derive everything that follows from them
+    def add_facts(self, facts):
+        for fact in facts:
+            if fact in self.base:
+                continue
+            self.base.add(fact)
+            if fact in self.level:
+                self.level[fact] = 0  # Already derived; now also given, which only lowers its level
+            else:
+                self._derive(fact, 0)
+        self._run()
+
+    def add_fact(self, fact):
+        self.add_facts((fact,))
+
+    # Retract base facts (facts that were never added are ignored) and everything that depended on them
+    def remove_facts(self, facts):
+        self._overdeleted = overdeleted = set()
+        self._pending = pending = []
+        try:
+            for fact in facts:
+                if fact in self.base:
+                    self.base.discard(fact)
+                    if fact not in overdeleted:
+                        self._schedule_overdelete(fact)
+            while pending:
+                fact = pending.pop()
+                self._activate(fact, False)  # May schedule the facts that lose their support
+                del self.level[fact]
+        finally:
+            self._overdeleted = self._pending = None
+
+        # Rederive phase: over-deleted facts still matched by surviving facts come back, lowest level first
+        rederived = []
+        for fact in overdeleted:
+            tokens = self.support.get(fact)
+            if tokens:
+                rederived.append((min(map(self._token_level, tokens)) + 1, fact))
+            else:
+                self.support.pop(fact, None)
+        for level, fact in sorted(rederived):
+            if fact not in self.level:
+                self._derive(fact, level)
+        self._run()
+
+    def remove_fact(self, fact):
+        self.remove_facts((fact,))
+
+    # The premise facts of a match that derives fact from lower levels (None for base facts).
+    # Following these from any fact reaches base facts, giving a proof.
+    def proof(self, fact):
+        if fact in self.base:
+            return None
+        level = self.level[fact]
+        for token in self.support.get(fact, ()):
+            if self._token_level(token) < level:
+                return token
+        raise KeyError(fact)
+
+    def __contains__(self, fact):
+        return fact in self.level
+
+    def __iter__(self):
+        return iter(self.level)
+
+    def __len__(self):
+        return len(self.level)
+
+
+# ---------------------------------------------------------------------------
+# Maze knowledge base
+# ---------------------------------------------------------------------------
+
+# At(y) follows from At(x) when y is adjacent to x: the forward form of the backward engine's
+# At(cell) <- At(neighbor) rules, stated once with variables instead of once per cell pair
+MAZE_RULES = (Rule(('At', '?y'), (('At', '?x'), ('Adjacent', '?x', '?y'))),)
+
+# Adjacent facts between a free position and each of its free neighbors, in both directions
+def adjacency_facts(grid, pos):
+    facts = []
+    for neighbor in grid.neighbors(pos):
+        facts.append(('Adjacent', pos, neighbor))
+        facts.append(('Adjacent', neighbor, pos))
+    return facts
+
+# Base facts of a maze: At(goal) and Adjacent(a, b) for every pair of neighboring free cells
+def maze_facts(grid, goal):
+    facts = [('At', goal)] if grid.is_free(goal) else []
+    for r in range(grid.rows):
+        for c in range(grid.cols):
+            if grid.is_free((r, c)):
+                facts.extend(('Adjacent', (r, c), neighbor) for neighbor in grid.neighbors((r, c)))
+    return facts
+
+# One maze queried many times under small edits: the closure of At(goal) (every cell from which
+# the goal can be reached) is kept up to date as cells are blocked or freed.
+# The reasoner owns the grid it is given; change cells through set_blocked so the facts follow.
+class MazeReasoner:
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = goal
+        self.engine = ForwardChainer(MAZE_RULES, maze_facts(grid, goal))
+
+    # Block or free a cell, adding or retracting only the facts that mention it
+    def set_blocked(self, pos, blocked=True):
+        if blocked == (pos in self.grid):
+            return
+        if blocked:
+            facts = adjacency_facts(self.grid, pos)
+            if pos == self.goal:
+                facts.append(('At', pos))
+            self.grid.set_blocked(pos, True)
+            self.engine.remove_facts(facts)
+        else:
+            self.grid.set_blocked(pos, False)
+            facts = adjacency_facts(self.grid, pos)
+            if pos == self.goal:
+                facts.append(('At', pos))
+            self.engine.add_facts(facts)
+
+    # Check whether the goal can be reached from pos
+    def can_reach(self, pos):
+        return ('At', pos) in self.engine
+
+    # Every position from which the goal can be reached
+    def reachable_cells(self):
+        return {fact[1] for fact in self.engine if fact[0] == 'At'}
+
+    # A path from start to the goal read off the proof of At(start) (shortest until cells are edited),
+    # or [] if there is none
+    def path(self, start):
+        fact = ('At', start)
+        if fact not in self.engine:
+            return []
+        path = [start]
+        while fact[1] != self.goal:
+            fact = next(f for f in self.engine.proof(fact) if f[0] == 'At')
+            path.append(fact[1])
+        return path
+
+# Positions from which goal can be reached, by forward chaining from At(goal)
+def closure(grid, goal):
+    return MazeReasoner(grid, goal).reachable_cells()
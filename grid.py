@@ -0,0 +1,105 @@
+# Compact grid representation (flat cell array, integer cell indices, neighbor offsets)
+
+BLOCKED = 1  # Cell value for obstacles and the outer border
+FREE = 0     # Cell value for walkable cells
+FREE_TO_DIGIT = bytes.maketrans(bytes([FREE, BLOCKED]), b'10')  # Cell bytes -> binary digits for bitmasks, free = '1'
+
+
+# Maze grid stored as a flat bytearray with a one-cell blocked border around it.
+# The border removes every bounds check from the search loops: a neighbor index
+# is just current index + offset, and border cells read as blocked.
+class Grid:
+    __slots__ = ('rows', 'cols', 'stride', 'cells', 'offsets')
+
+    def __init__(self, rows, cols, obstacles=()):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2  # Row length including the left and right border cells
+
+        # Build border row + interior rows + border row in one allocation
+        border_row = bytes([BLOCKED]) * self.stride
+        interior_row = bytes([BLOCKED]) + bytes(cols) + bytes([BLOCKED])
+        self.cells = bytearray(border_row + interior_row * rows + border_row)
+
+        # Index offsets to the up, down, left and right neighbors
+        self.offsets = (-self.stride, self.stride, -1, 1)
+
+        for pos in obstacles:
+            self.cells[self.index(pos)] = BLOCKED
+
+    # Rebuild a grid from the padded cell bytes of another grid (e.g. bytes shipped to a worker process)
+    @classmethod
+    def from_cells(cls, rows, cols, cells):
+        grid = cls.__new__(cls)
+        grid.rows, grid.cols, grid.stride = rows, cols, cols + 2
+        if len(cells) != (rows + 2) * grid.stride:
+            raise ValueError(f"Expected {(rows + 2) * grid.stride} cell bytes for a {rows}x{cols} grid, got {len(cells)}")
+        grid.cells = bytearray(cells)
+        grid.offsets = (-grid.stride, grid.stride, -1, 1)
+        return grid
+
+    # Convert a (row, col) position to its flat cell index
+    def index(self, pos):
+        return (pos[0] + 1) * self.stride + pos[1] + 1
+
+    # Convert a flat cell index back to its (row, col) position
+    def position(self, index):
+        r, c = divmod(index, self.stride)
+        return r - 1, c - 1
+
+    # Check whether a position lies inside the grid
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    # Check whether a position is free to walk on (in bounds and not an obstacle)
+    def is_free(self, pos):
+        return self.in_bounds(pos) and self.cells[self.index(pos)] == FREE
+
+    # Mark a single in-bounds position as blocked or free
+    def set_blocked(self, pos, blocked=True):
+        if not self.in_bounds(pos):
+            raise ValueError(f"Position {pos} is outside a {self.rows}x{self.cols} grid")
+        self.cells[self.index(pos)] = BLOCKED if blocked else FREE
+
+    # Free neighbor indices of a cell index, in up, down, left, right order
+    def neighbor_indices(self, index):
+        cells = self.cells
+        return [index + d for d in self.offsets if not cells[index + d]]
+
+    # Free neighbor positions of a position, in up, down, left, right order
+    def neighbors(self, pos):
+        return [self.position(i) for i in self.neighbor_indices(self.index(pos))]
+
+    # Independent copy of this grid
+    def copy(self):
+        return Grid.from_cells(self.rows, self.cols, self.cells)
+
+    # Set-like behaviour so a Grid can stand in for the obstacle set (e.g. in the drawing code)
+    def __contains__(self, pos):
+        return self.in_bounds(pos) and self.cells[self.index(pos)] == BLOCKED
+
+    def __iter__(self):
+        for r in range(self.rows):
+            base = (r + 1) * self.stride + 1
+            row = self.cells[base:base + self.cols]
+            c = row.find(BLOCKED)
+            while c != -1:
+                yield r, c
+                c = row.find(BLOCKED, c + 1)
+
+    def __len__(self):
+        # Number of obstacles, not counting the border
+        return self.cells.count(BLOCKED) - 2 * self.stride - 2 * self.rows
+
+    def __eq__(self, other):
+        return isinstance(other, Grid) and self.rows == other.rows and self.cols == other.cols and self.cells == other.cells
+
+    def __repr__(self):
+        return f"Grid({self.rows}, {self.cols}, {set(self)})"
+
+
+# Return obstacles as a Grid, converting a set of (row, col) tuples if needed
+def as_grid(obstacles, rows, cols):
+    if isinstance(obstacles, Grid):
+        return obstacles
+    return Grid(rows, cols, obstacles)
@@ -0,0 +1,147 @@
+# Heuristics for the headless solvers (solve_astar, solve_bidirectional_greedy)
+#
+# A heuristic is a factory: heuristic(grid, target) returns a function h(cell) from a flat cell
+# index to an estimate of its distance to target. The solvers call the factory once per search
+# (per direction for the bidirectional one) and h once per push, so any setup a heuristic needs,
+# like looking up the target's landmark distances, is paid once. For A* to stay optimal the
+# estimates must be admissible and consistent; all the heuristics here are.
+
+from reachability import distance_field, UNREACHABLE
+
+# Manhattan distance (the solvers' default)
+def manhattan(grid, target):
+    stride = grid.stride
+    target_row, target_col = divmod(grid.index(target), stride)
+
+    def h(cell):
+        r, c = divmod(cell, stride)
+        return abs(r - target_row) + abs(c - target_col)
+    return h
+
+# No estimate at all: A* becomes uniform-cost search (a baseline for the others)
+def zero(grid, target):
+    return lambda cell: 0
+
+# Exact distances from a BFS field of the target: perfect guidance, at the cost of a full BFS
+def exact(grid, target):
+    field = distance_field(grid, target)
+    return lambda cell: max(field[cell], 0)
+
+# Landmark (ALT) heuristic over precomputed Landmarks for the same grid
+def landmark(landmarks):
+    def factory(grid, target):
+        return landmarks.heuristic(target)
+    return factory
+
+# Largest of several heuristics (still admissible and consistent if they all are)
+def maximum(*factories):
+    def factory(grid, target):
+        hs = [make(grid, target) for make in factories]
+        return lambda cell: max(h(cell) for h in hs)
+    return factory
+
+
+# Distance fields from a few landmark cells, giving lower bounds on any distance through the
+# triangle inequality: d(a, b) >= |d(L, a) - d(L, b)| for every landmark L.
+class Landmarks:
+    def __init__(self, grid, count=8, seed=None):
+        self.grid = grid
+        self.cells = []   # Landmark cell indices
+        self.fields = []  # One distance field (array of ints indexed like grid.cells) per landmark
+        for cell in select_landmarks(grid, count, seed):
+            self.cells.append(cell)
+            self.fields.append(distance_field(grid, grid.position(cell)))
+
+    # Best lower bound on the distance between two cell indices
+    def lower_bound(self, a, b):
+        bound = 0
+        for field in self.fields:
+            da, db = field[a], field[b]
+            if da != UNREACHABLE and db != UNREACHABLE and abs(da - db) > bound:
+                bound = abs(da - db)
+        return bound
+
+    # Function h(cell index) -> lower bound on the cell's distance to goal
+    def heuristic(self, goal):
+        goal_index = self.grid.index(goal)
+        # Only landmarks in the goal's region say anything about distances to it
+        pairs = [(field, field[goal_index]) for field in self.fields if field[goal_index] != UNREACHABLE]
+
+        def h(cell):
+            bound = 0
+            for field, to_goal in pairs:
+                d = field[cell]
+                if d != UNREACHABLE:
+                    d = d - to_goal if d > to_goal else to_goal - d
+                    if d > bound:
+                        bound = d
+            return bound
+        return h
+
+# Pick landmark cells by farthest-point selection: each new landmark is the free cell farthest
+# from all landmarks chosen so far (cells on the periphery give the tightest bounds).
+# seed is the position to start from (default: the first free cell).
+def select_landmarks(grid, count, seed=None):
+    cells = grid.cells
+    if seed is None:
+        seed_index = next((i for i in range(len(cells)) if not cells[i]), None)
+        if seed_index is None:
+            return []  # No free cells
+    else:
+        seed_index = grid.index(seed)
+
+    # Distance to the nearest chosen landmark, starting from the seed alone
+    nearest = distance_field(grid, grid.position(seed_index))
+    landmarks = []
+    for _ in range(count):
+        farthest = max(range(len(nearest)), key=nearest.__getitem__)
+        if nearest[farthest] <= 0:
+            break  # Every reachable cell is already a landmark
+        landmarks.append(farthest)
+        field = distance_field(grid, grid.position(farthest))
+        for i, d in enumerate(field):
+            if d < nearest[i]:
+                nearest[i] = d
+    return landmarks
+
+
+# Total expansions of each heuristic over a set of mazes, and how many it saves against Manhattan.
+# heuristics maps names to factories; solver is solve_astar or solve_bidirectional_greedy.
+# Returns rows of (name, expanded, saved, saved fraction), Manhattan first.
+def expansions_report(mazes, heuristics, solver):
+    totals = {'manhattan': 0}
+    totals.update((name, 0) for name in heuristics)
+    for maze in mazes:
+        totals['manhattan'] += solver(maze.grid, maze.start, maze.goal).expanded
+        for name, factory in heuristics.items():
+            totals[name] += solver(maze.grid, maze.start, maze.goal, factory).expanded
+    baseline = totals['manhattan']
+    return [(name, expanded, baseline - expanded, (baseline - expanded) / baseline if baseline else 0.0)
+            for name, expanded in totals.items()]
+
+# Print an expansions_report as a table
+def print_report(title, rows):
+    print(title)
+    print(f"{'heuristic':<12}{'expanded':>12}{'saved':>12}{'saved %':>10}")
+    for name, expanded, saved, fraction in rows:
+        print(f"{name:<12}{expanded:>12}{saved:>12}{fraction:>10.1%}")
+
+
+if __name__ == "__main__":
+    from maze import GENERATORS, make_maze
+    from a_star import solve_astar
+    from bidirectional_Greedy import solve_bidirectional_greedy
+
+    # Seeded benchmark set: every generator at two sizes, start and goal in opposite corners
+    mazes = [make_maze(kind, size, size, rng=seed) for kind in GENERATORS for size in (31, 63) for seed in range(3)]
+    for title, solver in (("A*", solve_astar), ("Bidirectional greedy", solve_bidirectional_greedy)):
+        # Landmarks are per grid, so the factory picks the ones built for the maze being solved
+        landmark_sets = {id(maze.grid): Landmarks(maze.grid, 8) for maze in mazes}
+        heuristics = {
+            'zero': zero,
+            'landmarks': lambda grid, target: landmark_sets[id(grid)].heuristic(target),
+            'max': maximum(manhattan, lambda grid, target: landmark_sets[id(grid)].heuristic(target)),
+            'exact': exact,
+        }
+        print_report(title, expansions_report(mazes, heuristics, solver))
+        print()
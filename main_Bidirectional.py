@@ -1,34 +1,63 @@
 import pygame
 import sys
-import heapq
-# Import constants, helper functions, and external modules
-from constants import ROWS, COLS, CELL_SIZE, WINDOW_HEIGHT, start, goal, NUM_OBSTACLES, DEFAULT_OBSTACLES, moves
-from maze import generate_random_obstacles
+# Import helper functions and external modules
+from maze import DEFAULT_ROWS, DEFAULT_COLS, default_maze, random_default_maze
 from bidirectional_Greedy import heuristic, reconstruct_path
-from visualisation import draw_grid_bidirectional, draw_buttons
-from state_manager import save_state_bidirectional, load_previous_state_bidirectional
-
-# Initialize all search-related data structures
-def reset_all(obstacles):
+from visualisation import draw_grid_bidirectional, draw_buttons, window_size
+from state_manager import (History, TrackedHeap, TrackedSet, TrackedDict,
+                           save_state_bidirectional, load_previous_state_bidirectional)
+from tracing import Tracer
+
+# Console output of the step-by-step search: step_bidirectional reports its expansions to this
+# tracer, and print_step prints them after each step with both frontiers from the GUI state.
+# state is a callable returning the GUI's current (queue_start, queue_goal, expanded_start, expanded_goal).
+class ConsoleTracer(Tracer):
+    def __init__(self, state):
+        self.state = state
+        self.expanded = {}  # Side -> cell expanded on that side in the current step
+
+    def on_expand(self, cell, side=None):
+        self.expanded[side] = cell
+
+    def on_goal(self, path, cost):
+        print("\n--- Goal reached! ---")
+        print(f"Solution path: {path}")
+
+    def print_step(self):
+        queue_start, queue_goal, expanded_start, expanded_goal = self.state()
+        print("\n--- Step Taken ---")
+        if 'start' in self.expanded:
+            print(f"Expanded from Start side: {self.expanded['start']}")
+        if 'goal' in self.expanded:
+            print(f"Expanded from Goal side: {self.expanded['goal']}")
+        print(f"Frontier (Start Queue): {[item[1] for item in queue_start]}")
+        print(f"Frontier (Goal Queue): {[item[1] for item in queue_goal]}")
+        print(f"Total nodes expanded so far: {len(expanded_start.union(expanded_goal))}")
+        self.expanded = {}
+
+# Initialize all search-related data structures for the given maze
+def reset_all(maze):
+    start, goal = maze.start, maze.goal
+    # History stack for undo; every container below logs its changes to it
+    history = History()
     # Queues for both directions
-    queue_start = [(heuristic(start, goal), start)]
-    queue_goal = [(heuristic(goal, start), goal)]
+    queue_start = TrackedHeap(history, [(heuristic(start, goal), start)])
+    queue_goal = TrackedHeap(history, [(heuristic(goal, start), goal)])
     # Visited nodes and parent tracking for both directions
-    visited_start = {start}
-    visited_goal = {goal}
-    parents_start = {start: None}
-    parents_goal = {goal: None}
+    visited_start = TrackedSet(history, {start})
+    visited_goal = TrackedSet(history, {goal})
+    parents_start = TrackedDict(history, {start: None})
+    parents_goal = TrackedDict(history, {goal: None})
     # Heuristic values for nodes
-    h_start = {start: heuristic(start, goal)}
-    h_goal = {goal: heuristic(goal, start)}
+    h_start = TrackedDict(history, {start: heuristic(start, goal)})
+    h_goal = TrackedDict(history, {goal: heuristic(goal, start)})
     # Search result status
     found = False
     final_path = []
     expanded_node_start = None
     expanded_node_goal = None
-    history = []  # History stack for undo
-    expanded_start = set()
-    expanded_goal = set()
+    expanded_start = TrackedSet(history)
+    expanded_goal = TrackedSet(history)
 
     # Save the initial state
     save_state_bidirectional(queue_start, queue_goal, visited_start, visited_goal, None, parents_start, parents_goal, found, final_path, history)
@@ -37,63 +66,76 @@ def reset_all(obstacles):
             h_start, h_goal, found, final_path, expanded_node_start, expanded_node_goal, history,
             expanded_start, expanded_goal)
 
-# Perform one step of the bidirectional search
+# Perform one step of the bidirectional search (an optional tracer sees its expand, push and close events)
 def step_bidirectional(queue_start, queue_goal, visited_start, visited_goal,
                        parents_start, parents_goal, h_start, h_goal,
-                       obstacles, expanded_start, expanded_goal):
+                       maze, expanded_start, expanded_goal, tracer=None):
 
     expanded_node_start = None
     expanded_node_goal = None
+    grid, start, goal = maze.grid, maze.start, maze.goal  # Grid gives neighbors without per-move bounds checks
 
     # Expand from start direction
     if queue_start:
-        _, current = heapq.heappop(queue_start)
+        _, current = queue_start.heappop()
         expanded_node_start = current
         expanded_start.add(current)
-        for move in moves:
-            neighbor = (current[0] + move[0], current[1] + move[1])
-            if 0 <= neighbor[0] < ROWS and 0 <= neighbor[1] < COLS and neighbor not in obstacles and neighbor not in visited_start:
+        if tracer is not None:
+            tracer.on_expand(current, 'start')
+        for neighbor in grid.neighbors(current):
+            if neighbor not in visited_start:
                 parents_start[neighbor] = current
                 visited_start.add(neighbor)
                 h = heuristic(neighbor, goal)
                 h_start[neighbor] = h
-                heapq.heappush(queue_start, (h, neighbor))
+                queue_start.heappush((h, neighbor))
+                if tracer is not None:
+                    tracer.on_push(neighbor, h, 'start')
                 if neighbor in visited_goal:
                     return True, neighbor, expanded_node_start, expanded_node_goal
+        if tracer is not None:
+            tracer.on_close(current, 'start')
 
     # Expand from goal direction
     if queue_goal:
-        _, current = heapq.heappop(queue_goal)
+        _, current = queue_goal.heappop()
         expanded_node_goal = current
         expanded_goal.add(current)
-        for move in moves:
-            neighbor = (current[0] + move[0], current[1] + move[1])
-            if 0 <= neighbor[0] < ROWS and 0 <= neighbor[1] < COLS and neighbor not in obstacles and neighbor not in visited_goal:
+        if tracer is not None:
+            tracer.on_expand(current, 'goal')
+        for neighbor in grid.neighbors(current):
+            if neighbor not in visited_goal:
                 parents_goal[neighbor] = current
                 visited_goal.add(neighbor)
                 h = heuristic(neighbor, start)
                 h_goal[neighbor] = h
-                heapq.heappush(queue_goal, (h, neighbor))
+                queue_goal.heappush((h, neighbor))
+                if tracer is not None:
+                    tracer.on_push(neighbor, h, 'goal')
                 if neighbor in visited_start:
                     return True, neighbor, expanded_node_start, expanded_node_goal
+        if tracer is not None:
+            tracer.on_close(current, 'goal')
 
     return False, None, expanded_node_start, expanded_node_goal
 
 # Main visualization loop
 def main():
     pygame.init()
-    screen = pygame.display.set_mode((COLS * CELL_SIZE, WINDOW_HEIGHT))
+    screen = pygame.display.set_mode(window_size(DEFAULT_ROWS, DEFAULT_COLS))
     pygame.display.set_caption("Bidirectional Greedy Search Visualization")
     clock = pygame.time.Clock()
 
-    # Start with randomized obstacles
-    obstacles = generate_random_obstacles(start, goal, ROWS, COLS, NUM_OBSTACLES)
-    print("Obstacles:", obstacles)
+    # Start with a randomized maze
+    maze = random_default_maze()
+    print("Obstacles:", set(maze.grid))
 
     # Initialize search data structures
     (queue_start, queue_goal, visited_start, visited_goal, parents_start, parents_goal,
      h_start, h_goal, found, final_path, expanded_node_start, expanded_node_goal, history,
-     expanded_start, expanded_goal) = reset_all(obstacles)
+     expanded_start, expanded_goal) = reset_all(maze)
+    # The lambda reads main's variables when called, so it follows resets and undos
+    tracer = ConsoleTracer(lambda: (queue_start, queue_goal, expanded_start, expanded_goal))
 
     running = True
     while running:
@@ -119,7 +161,7 @@ def main():
 
         # Draw the updated grid and buttons
         draw_grid_bidirectional(screen, visited_start, visited_goal, start_path, goal_path,
-                                final_path, {**parents_start, **parents_goal}, obstacles, costs_combined)
+                                final_path, {**parents_start, **parents_goal}, maze, costs_combined)
         step_rect, back_rect, rand_rect, def_rect = draw_buttons(screen)
 
         for event in pygame.event.get():
@@ -135,49 +177,39 @@ def main():
                         found, meet_point, expanded_node_start, expanded_node_goal = step_bidirectional(
                             queue_start, queue_goal, visited_start, visited_goal,
                             parents_start, parents_goal, h_start, h_goal,
-                            obstacles, expanded_start, expanded_goal
+                            maze, expanded_start, expanded_goal, tracer
                         )
+                        tracer.print_step()
 
-                        print("\n--- Step Taken ---")
-                        if expanded_node_start:
-                            print(f"Expanded from Start side: {expanded_node_start}")
-                        if expanded_node_goal:
-                            print(f"Expanded from Goal side: {expanded_node_goal}")
-                        print(f"Frontier (Start Queue): {[item[1] for item in queue_start]}")
-                        print(f"Frontier (Goal Queue): {[item[1] for item in queue_goal]}")
-                        print(f"Total nodes expanded so far: {len(expanded_start.union(expanded_goal))}")
-
-                        # If path is found, reconstruct and print it
+                        # If path is found, reconstruct and report it
                         if found:
                             final_path = reconstruct_path(parents_start, parents_goal, meet_point)
-                            print("\n--- Goal reached! ---")
-                            print(f"Solution path: {final_path}")
+                            tracer.on_meet(meet_point, len(final_path) - 1)
+                            tracer.on_goal(final_path, len(final_path) - 1)
 
                 if back_rect.collidepoint(event.pos):
                     # Undo last step
                     if len(history) > 1:
                         (queue_start, queue_goal, visited_start, visited_goal, _,
                          parents_start, parents_goal, found, final_path) = load_previous_state_bidirectional(history)
-                        h_start = {n: heuristic(n, goal) for n in parents_start}
-                        h_goal = {n: heuristic(n, start) for n in parents_goal}
-                        expanded_node_start, expanded_node_goal = None, None
+                        expanded_node_start, expanded_node_goal = None, None  # h values and expanded sets are undone in place
                         print("\n--- Went back one step ---")
 
                 if rand_rect.collidepoint(event.pos):
                     # Load new randomized maze
-                    obstacles = generate_random_obstacles(start, goal, ROWS, COLS, NUM_OBSTACLES)
-                    print("Randomized obstacles:", obstacles)
+                    maze = random_default_maze()
+                    print("Randomized obstacles:", set(maze.grid))
                     (queue_start, queue_goal, visited_start, visited_goal, parents_start, parents_goal,
                      h_start, h_goal, found, final_path, expanded_node_start, expanded_node_goal, history,
-                     expanded_start, expanded_goal) = reset_all(obstacles)
+                     expanded_start, expanded_goal) = reset_all(maze)
 
                 if def_rect.collidepoint(event.pos):
                     # Load default obstacle set
-                    obstacles = set(DEFAULT_OBSTACLES)
-                    print("Default maze loaded:", obstacles)
+                    maze = default_maze()
+                    print("Default maze loaded:", set(maze.grid))
                     (queue_start, queue_goal, visited_start, visited_goal, parents_start, parents_goal,
                      h_start, h_goal, found, final_path, expanded_node_start, expanded_node_goal, history,
-                     expanded_start, expanded_goal) = reset_all(obstacles)
+                     expanded_start, expanded_goal) = reset_all(maze)
 
         pygame.display.update()
         clock.tick(60)  # Limit to 60 FPS
@@ -2,27 +2,56 @@
 
 import pygame
 import sys
-import heapq
-
-from constants import ROWS, COLS, CELL_SIZE, WINDOW_HEIGHT, start, goal, NUM_OBSTACLES, DEFAULT_OBSTACLES
-from maze import generate_random_obstacles
-from a_star import Node, heuristic, reconstruct_path, expand_node, print_path, print_frontier
-from visualisation import draw_grid, draw_buttons, draw_candidate_arrows
-from state_manager import save_state, load_previous_state
-
-
-def reset_all(obstacles):
-    # Initialize/reset all data structures for a new search session
-    open_set = []  # priority queue for nodes to explore
-    start_node = Node(start, 0, heuristic(start, goal))
-    heapq.heappush(open_set, start_node)
-    visited = set()  # set of visited nodes
-    parents = {start: None}  # parent links for reconstructing path
-    open_dict = {start: 0}  # dictionary for quick cost lookup
+
+from maze import DEFAULT_ROWS, DEFAULT_COLS, default_maze, random_default_maze
+from a_star import Node, heuristic, reconstruct_path, expand_node, pop_node, print_path, print_frontier
+from visualisation import draw_grid, draw_buttons, window_size, draw_candidate_arrows
+from state_manager import History, TrackedHeap, TrackedSet, TrackedDict, save_state, load_previous_state
+from tracing import Tracer
+
+
+# Console output of the step-by-step search: the Step handler reports search events to this
+# tracer, which prints them together with the frontier and current path of the GUI state.
+# state is a callable returning the GUI's current (open_dict, visited, current_node).
+class ConsoleTracer(Tracer):
+    def __init__(self, state):
+        self.state = state
+        self.new_frontier = []  # Cells pushed by the expansion in progress
+
+    def on_expand(self, cell, side=None):
+        open_dict, visited, current_node = self.state()
+        self.new_frontier = []
+        print(f"\nExpanding node: {cell}")
+        print_frontier(open_dict)
+        print_path("Current path", reconstruct_path(current_node))
+        print(f"Total nodes expanded: {len(visited) + 1}")
+
+    def on_push(self, cell, priority, side=None):
+        self.new_frontier.append(cell)
+
+    def on_close(self, cell, side=None):
+        print("New frontier nodes added:", self.new_frontier)
+
+    def on_goal(self, path, cost):
+        open_dict, visited, _ = self.state()
+        print("\n--- Goal reached! ---")
+        print_path("Solution path", path)
+        print(f"Total nodes expanded: {len(visited) + 1}")
+        print("Final frontier (open set):", list(open_dict.keys()))
+
+
+def reset_all(maze):
+    # Initialize/reset all data structures for a new search session on the given maze
+    # (containers are tracked so Back can undo each step's changes without copying)
+    history = History()  # history for backtracking
+    start_node = Node(maze.start, 0, heuristic(maze.start, maze.goal))
+    open_set = TrackedHeap(history, [start_node])  # priority queue for nodes to explore
+    visited = TrackedSet(history)  # set of visited nodes
+    parents = TrackedDict(history, {maze.start: None})  # parent links for reconstructing path
+    open_dict = TrackedDict(history, {maze.start: 0})  # dictionary for quick cost lookup
     found = False  # goal not found yet
     final_path = []  # solution path
     current_node = None  # node currently being expanded
-    history = []  # history for backtracking
     save_state(open_set, visited, current_node, parents, open_dict, found, final_path, history)
     return open_set, visited, current_node, parents, open_dict, found, final_path, history
 
@@ -30,16 +59,18 @@ def reset_all(obstacles):
 def main():
     pygame.init()
     # Set up Pygame screen
-    screen = pygame.display.set_mode((COLS * CELL_SIZE, WINDOW_HEIGHT))
+    screen = pygame.display.set_mode(window_size(DEFAULT_ROWS, DEFAULT_COLS))
     pygame.display.set_caption("A* Algorithm Visualization")
     clock = pygame.time.Clock()
 
-    # Create initial obstacles
-    obstacles = generate_random_obstacles(start, goal, ROWS, COLS, NUM_OBSTACLES)
-    print("Obstacles:", obstacles)
+    # Create initial maze
+    maze = random_default_maze()
+    print("Obstacles:", set(maze.grid))
 
     # Initialize search structures
-    open_set, visited, current_node, parents, open_dict, found, final_path, history = reset_all(obstacles)
+    open_set, visited, current_node, parents, open_dict, found, final_path, history = reset_all(maze)
+    # The lambda reads main's variables when called, so it follows resets and undos
+    tracer = ConsoleTracer(lambda: (open_dict, visited, current_node))
 
     running = True
     while running:
@@ -48,11 +79,11 @@ def main():
         # Decide which path to draw: current path or final path
         current_display_path = reconstruct_path(current_node) if current_node and not found else final_path
 
-        draw_grid(screen, visited, current_display_path, parents, obstacles, open_dict)
+        draw_grid(screen, visited, current_display_path, parents, maze, open_dict)
 
         # Draw arrows to show available moves from current node
         if current_node and not found:
-            draw_candidate_arrows(screen, current_node.position, visited, obstacles)
+            draw_candidate_arrows(screen, current_node.position, visited, maze)
 
         # Draw control buttons
         step_rect, back_rect, rand_rect, def_rect = draw_buttons(screen)
@@ -66,28 +97,24 @@ def main():
                     if open_set and not found:
                         save_state(open_set, visited, current_node, parents, open_dict, found, final_path, history)
 
-                        # Pop the lowest-f-cost node from the open set
-                        current_node = heapq.heappop(open_set)
+                        # Pop the lowest-f-cost node from the open set, skipping stale duplicates
+                        next_node = pop_node(open_set, visited, TrackedHeap.heappop)  # Logged for undo
+                        if next_node is None:
+                            continue
+                        current_node = next_node
                         open_dict.pop(current_node.position, None)
-                        print(f"\nExpanding node: {current_node.position}")
-                        print_frontier(open_dict)
-                        print_path("Current path", reconstruct_path(current_node))
-                        print(f"Total nodes expanded: {len(visited) + 1}")
+                        tracer.on_expand(current_node.position)
 
                         # Check if goal reached
-                        if current_node.position == goal:
+                        if current_node.position == maze.goal:
                             final_path = reconstruct_path(current_node)
                             found = True
-                            print("\n--- Goal reached! ---")
-                            print_path("Solution path", final_path)
-                            print(f"Total nodes expanded: {len(visited) + 1}")
-                            print("Final frontier (open set):", list(open_dict.keys()))
+                            tracer.on_goal(final_path, current_node.g)
 
                         # Expand the current node (add neighbors to open set)
                         if current_node.position not in visited:
-                            new_frontier = expand_node(current_node, open_set, visited, parents, open_dict, obstacles,
-                                                       goal)
-                            print("New frontier nodes added:", new_frontier)
+                            expand_node(current_node, open_set, visited, parents, open_dict, maze.grid, maze.goal, tracer,
+                                        TrackedHeap.heappush)
 
                 # Handle Back button (undo last step)
                 if back_rect.collidepoint(event.pos):
@@ -102,15 +129,15 @@ def main():
 
                 # Handle Randomize Maze button
                 if rand_rect.collidepoint(event.pos):
-                    obstacles = generate_random_obstacles(start, goal, ROWS, COLS, NUM_OBSTACLES)
-                    print("Randomized obstacles:", obstacles)
-                    open_set, visited, current_node, parents, open_dict, found, final_path, history = reset_all(obstacles)
+                    maze = random_default_maze()
+                    print("Randomized obstacles:", set(maze.grid))
+                    open_set, visited, current_node, parents, open_dict, found, final_path, history = reset_all(maze)
 
                 # Handle Default Maze button
                 if def_rect.collidepoint(event.pos):
-                    obstacles = set(DEFAULT_OBSTACLES)
-                    print("Default maze loaded:", obstacles)
-                    open_set, visited, current_node, parents, open_dict, found, final_path, history = reset_all(obstacles)
+                    maze = default_maze()
+                    print("Default maze loaded:", set(maze.grid))
+                    open_set, visited, current_node, parents, open_dict, found, final_path, history = reset_all(maze)
 
         # Refresh the screen
         pygame.display.update()
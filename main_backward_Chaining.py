@@ -0,0 +1,71 @@
+# Backward-chaining maze solver GUI: setup, Pygame window, event handling
+
+import pygame
+import sys
+from visualisation import draw_grid_backward_chaining, draw_buttons, window_size
+from maze import DEFAULT_ROWS, DEFAULT_COLS, default_maze, random_default_maze
+from backward_Chaining import at_fact, run_inference
+
+# Pygame GUI to visualize backward chaining step-by-step
+def main():
+    print("Backward-Chaining Maze Solver")
+    pygame.init()
+    screen = pygame.display.set_mode(window_size(DEFAULT_ROWS, DEFAULT_COLS))
+    pygame.display.set_caption("Backward-Chaining Path Visualization")
+    clock = pygame.time.Clock()
+
+    current_maze = default_maze()
+    full_path = run_inference(current_maze)
+    step_index = 1  # For stepping through the path
+    rule_display_map = {}  # Visual mapping of applied rules
+
+    running = True
+    while running:
+        screen.fill((220, 220, 220))
+        current_path = full_path[:step_index]  # Current visible path
+
+        draw_grid_backward_chaining(screen, set(), set(), [], [], current_path, {}, current_maze, rule_display_map)
+        step_rect, back_rect, rand_rect, def_rect = draw_buttons(screen)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if step_rect.collidepoint(event.pos):
+                    if step_index < len(full_path):
+                        if step_index > 0:
+                            from_pos = full_path[step_index - 1]
+                            to_pos = full_path[step_index]
+                            rule_text = f"{at_fact(from_pos)} <- {at_fact(to_pos)}"
+                            rule_display_map[to_pos] = [rule_text]
+                        step_index += 1
+
+                elif back_rect.collidepoint(event.pos):
+                    if step_index > 1:
+                        removed_pos = full_path[step_index - 1]
+                        rule_display_map.pop(removed_pos, None)
+                        step_index -= 1
+
+                elif rand_rect.collidepoint(event.pos):
+                    current_maze = random_default_maze()
+                    full_path = run_inference(current_maze)
+                    step_index = 1
+                    rule_display_map = {}
+                    print("Randomized maze generated.")
+
+                elif def_rect.collidepoint(event.pos):
+                    current_maze = default_maze()
+                    full_path = run_inference(current_maze)
+                    step_index = 1
+                    rule_display_map = {}
+                    print("Default maze loaded.")
+
+        pygame.display.update()
+        clock.tick(30)
+
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,283 @@
 # Maze generation, solvability checking
 
 import random  # For random obstacle placement
-from collections import deque  # For BFS queue
-from constants import moves  # Directions used to navigate the maze
+from grid import Grid, as_grid, BLOCKED, FREE  # Compact grid with integer cell indices
+from reachability import is_reachable, distance_field  # Reachability check (bitboard flood with BFS fallback) and BFS distances
+
+# A single maze instance: its grid (which carries the dimensions) plus its own start and goal.
+# Solvers and drawing code read everything from here, so mazes of different sizes can coexist.
+class Maze:
+    __slots__ = ('grid', 'start', 'goal')
+
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+
+    @property
+    def rows(self):
+        return self.grid.rows
+
+    @property
+    def cols(self):
+        return self.grid.cols
+
+    def __repr__(self):
+        return f"Maze({self.grid!r}, start={self.start}, goal={self.goal})"
 
 # Check if a position is within bounds and not an obstacle
 def is_valid(pos, rows, cols, obstacles):
     r, c = pos
     return 0 <= r < rows and 0 <= c < cols and pos not in obstacles
 
+# Turn an rng argument into a random.Random: None -> fresh generator, int -> seeded generator
+def make_rng(rng=None):
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
+
 # Generate a set of random obstacles that still allows a valid path from start to goal
-def generate_random_obstacles(start, goal, rows, cols, num_obstacles):
-    # Generate a list of all cells in the grid
-    all_cells = [(r, c) for r in range(rows) for c in range(cols)]
-    all_cells.remove(start)
-    all_cells.remove(goal)
+# by rejection sampling. rng is a random.Random or an int seed, so independent generators
+# don't share state. Use corridor_maze for high densities, where rejection rarely succeeds.
+def generate_random_obstacles(start, goal, rows, cols, num_obstacles, rng=None):
+    rng = make_rng(rng)
+    all_cells = _obstacle_candidates(start, goal, rows, cols)
 
     while True:
         # Randomly sample obstacle positions
-        obstacles = set(random.sample(all_cells, num_obstacles))
+        obstacles = set(rng.sample(all_cells, num_obstacles))
         # Only return obstacles if the resulting maze is solvable
         if is_solvable(start, goal, obstacles, rows, cols):
             return obstacles
 
-# Check if there's a path from start to goal using BFS
+# A single random obstacle set, not checked for solvability (the first candidate that
+# generate_random_obstacles would try with the same rng)
+def sample_obstacles(start, goal, rows, cols, num_obstacles, rng=None):
+    return set(make_rng(rng).sample(_obstacle_candidates(start, goal, rows, cols), num_obstacles))
+
+# List of all cells in the grid except start and goal
+def _obstacle_candidates(start, goal, rows, cols):
+    all_cells = [(r, c) for r in range(rows) for c in range(cols)]
+    all_cells.remove(start)
+    all_cells.remove(goal)
+    return all_cells
+
+# Generate a random solvable maze with its own dimensions, start and goal
+def random_maze(rows, cols, num_obstacles, start=(0, 0), goal=None, rng=None):
+    if goal is None:
+        goal = (rows - 1, cols - 1)  # Default goal is the bottom-right corner
+    obstacles = generate_random_obstacles(start, goal, rows, cols, num_obstacles, rng)
+    return Maze(Grid(rows, cols, obstacles), start, goal)
+
+# The maze the GUIs start from and reset to. Their random mazes have the same size, start and
+# goal, with NUM_OBSTACLES obstacles.
+DEFAULT_ROWS, DEFAULT_COLS = 5, 6
+DEFAULT_START, DEFAULT_GOAL = (0, 0), (4, 5)
+DEFAULT_OBSTACLES = {(0, 1), (2, 1), (3, 1), (2, 3), (3, 4), (4, 4)}
+NUM_OBSTACLES = 8
+
+# A fresh copy of the default maze
+def default_maze():
+    return Maze(Grid(DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_OBSTACLES), DEFAULT_START, DEFAULT_GOAL)
+
+# A random solvable maze the size of the default one
+def random_default_maze(rng=None):
+    return random_maze(DEFAULT_ROWS, DEFAULT_COLS, NUM_OBSTACLES, DEFAULT_START, DEFAULT_GOAL, rng)
+
+# Check if there's a path from start to goal (flood fill with a BFS fallback, see reachability.py)
+# obstacles may be a Grid or a set of obstacle positions
 def is_solvable(start, goal, obstacles, rows, cols):
-    queue = deque([start])
-    visited = {start}
-
-    while queue:
-        current = queue.popleft()
-
-        if current == goal:
-            return True  # Found a path to the goal
-
-        # Explore all neighboring cells
-        for move in moves:
-            neighbor = (current[0] + move[0], current[1] + move[1])
-            if (
-                0 <= neighbor[0] < rows and
-                0 <= neighbor[1] < cols and
-                neighbor not in obstacles and
-                neighbor not in visited
-            ):
-                visited.add(neighbor)
-                queue.append(neighbor)
-
-    return False  # No path found to the goal
+    return is_reachable(as_grid(obstacles, rows, cols), start, goal)
+
+
+# ---------------------------------------------------------------------------
+# Generators that are solvable by construction (no rejection loop).
+# All take (rows, cols, density, start, goal, rng) and return a Maze. density is the target
+# fraction of blocked cells (None keeps the generator's natural density), and rng is a
+# random.Random or an int seed.
+# ---------------------------------------------------------------------------
+
+# Random monotone corridor from start to goal, then random obstacles everywhere else
+def corridor_maze(rows, cols, density=0.3, start=(0, 0), goal=None, rng=None):
+    rng = make_rng(rng)
+    goal = _default_goal(rows, cols, goal)
+    grid = Grid(rows, cols)
+
+    # A shuffled sequence of the required row and column steps is a random shortest path
+    (r, c), (goal_r, goal_c) = start, goal
+    steps = [(1 if goal_r > r else -1, 0)] * abs(goal_r - r) + [(0, 1 if goal_c > c else -1)] * abs(goal_c - c)
+    rng.shuffle(steps)
+    corridor = {grid.index(start)}
+    for dr, dc in steps:
+        r, c = r + dr, c + dc
+        corridor.add(grid.index((r, c)))
+
+    _adjust_density(grid, density or 0.0, corridor, rng)
+    return Maze(grid, start, goal)
+
+# Perfect maze (exactly one path between any two open lattice cells) by randomized depth-first search
+def backtracker_maze(rows, cols, density=None, start=(0, 0), goal=None, rng=None):
+    rng = make_rng(rng)
+    grid = _blocked_grid(rows, cols)
+    cells = grid.cells
+    steps = tuple(2 * offset for offset in grid.offsets)  # Lattice cells are two grid cells apart
+
+    first = _random_lattice_cell(grid, rng)
+    cells[first] = FREE
+    stack = [first]
+    while stack:
+        current = stack[-1]
+        # Unvisited lattice neighbors: inside the grid and still blocked
+        options = [step for step in steps if _lattice_blocked(grid, current + step)]
+        if not options:
+            stack.pop()
+            continue
+        step = rng.choice(options)
+        cells[current + step // 2] = FREE  # Knock down the wall in between
+        cells[current + step] = FREE
+        stack.append(current + step)
+
+    return _finish_perfect_maze(grid, density, start, goal, rng)
+
+# Perfect maze by randomized Kruskal: join lattice cells across shuffled walls with union-find
+def kruskal_maze(rows, cols, density=None, start=(0, 0), goal=None, rng=None):
+    rng = make_rng(rng)
+    grid = _blocked_grid(rows, cols)
+    cells, stride = grid.cells, grid.stride
+
+    lattice = _lattice_cells(grid)
+    for index in lattice:
+        cells[index] = FREE
+    # Walls to the right and below each lattice cell that has a lattice neighbor there
+    walls = [(index, index + step) for index in lattice for step in (2, 2 * stride)
+             if _lattice_cell(grid, index + step)]
+    rng.shuffle(walls)
+
+    parent = {index: index for index in lattice}
+
+    def find(index):
+        root = index
+        while parent[root] != root:
+            root = parent[root]
+        while parent[index] != root:  # Path compression
+            parent[index], index = root, parent[index]
+        return root
+
+    for a, b in walls:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            cells[(a + b) // 2] = FREE
+
+    return _finish_perfect_maze(grid, density, start, goal, rng)
+
+# Perfect maze by Wilson's algorithm: loop-erased random walks, giving a uniform spanning tree
+def wilson_maze(rows, cols, density=None, start=(0, 0), goal=None, rng=None):
+    rng = make_rng(rng)
+    grid = _blocked_grid(rows, cols)
+    cells = grid.cells
+    steps = tuple(2 * offset for offset in grid.offsets)
+
+    lattice = _lattice_cells(grid)
+    rng.shuffle(lattice)
+    in_tree = bytearray(len(cells))
+    in_tree[lattice[0]] = 1
+    cells[lattice[0]] = FREE
+    next_step = {}  # Last step taken out of each cell; overwriting it erases loops
+
+    for walk_start in lattice[1:]:
+        if in_tree[walk_start]:
+            continue
+        current = walk_start
+        while not in_tree[current]:
+            step = rng.choice([step for step in steps if _lattice_cell(grid, current + step)])
+            next_step[current] = step
+            current += step
+        # Replay the loop-erased walk and add it to the tree
+        current = walk_start
+        while not in_tree[current]:
+            step = next_step[current]
+            in_tree[current] = 1
+            cells[current] = FREE
+            cells[current + step // 2] = FREE
+            current += step
+
+    return _finish_perfect_maze(grid, density, start, goal, rng)
+
+# Solvable generators by name (see the comment above corridor_maze for the shared signature)
+GENERATORS = {
+    'corridor': corridor_maze,
+    'backtracker': backtracker_maze,
+    'kruskal': kruskal_maze,
+    'wilson': wilson_maze,
+}
+
+# Generate a maze with a named generator
+def make_maze(kind, rows, cols, density=None, start=(0, 0), goal=None, rng=None):
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown generator {kind!r}; expected one of {sorted(GENERATORS)}")
+    return GENERATORS[kind](rows, cols, density, start, goal, rng)
+
+
+def _default_goal(rows, cols, goal):
+    return (rows - 1, cols - 1) if goal is None else goal
+
+# Grid with every interior cell blocked, ready for carving
+def _blocked_grid(rows, cols):
+    grid = Grid(rows, cols)
+    return Grid.from_cells(rows, cols, bytes([BLOCKED]) * len(grid.cells))
+
+# Lattice cells (even row and even column) are the rooms of a perfect maze; odd cells are walls
+def _lattice_cell(grid, index):
+    r, c = grid.position(index)
+    return 0 <= r < grid.rows and 0 <= c < grid.cols and r % 2 == 0 and c % 2 == 0
+
+def _lattice_blocked(grid, index):
+    return _lattice_cell(grid, index) and grid.cells[index] == BLOCKED
+
+def _lattice_cells(grid):
+    return [grid.index((r, c)) for r in range(0, grid.rows, 2) for c in range(0, grid.cols, 2)]
+
+def _random_lattice_cell(grid, rng):
+    return grid.index((2 * rng.randrange((grid.rows + 1) // 2), 2 * rng.randrange((grid.cols + 1) // 2)))
+
+# Open start and goal (joining them to the lattice if they sit on wall cells), then hit the density target
+def _finish_perfect_maze(grid, density, start, goal, rng):
+    goal = _default_goal(grid.rows, grid.cols, goal)
+    for r, c in (start, goal):
+        grid.set_blocked((r, c), False)
+        if r % 2:
+            r -= 1
+            grid.set_blocked((r, c), False)
+        if c % 2:
+            c -= 1
+            grid.set_blocked((r, c), False)
+    if density is not None:
+        _adjust_density(grid, density, _path_cells(grid, start, goal), rng)
+    return Maze(grid, start, goal)
+
+# Cell indices on one shortest start-goal path (the cells that must stay open)
+def _path_cells(grid, start, goal):
+    dist = distance_field(grid, goal)
+    current = grid.index(start)
+    path = {current}
+    while dist[current] > 0:
+        current = next(n for n in grid.neighbor_indices(current) if dist[n] == dist[current] - 1)
+        path.add(current)
+    return path
+
+# Open random blocked cells or block random free cells (never those in keep) until the
+# blocked fraction reaches density; opening cells can never disconnect a path
+def _adjust_density(grid, density, keep, rng):
+    cells = grid.cells
+    interior = [grid.index((r, c)) for r in range(grid.rows) for c in range(grid.cols)]
+    target = min(round(density * len(interior)), len(interior) - len(keep))
+    blocked = [index for index in interior if cells[index] == BLOCKED]
+
+    if len(blocked) > target:
+        for index in rng.sample(blocked, len(blocked) - target):
+            cells[index] = FREE
+    elif len(blocked) < target:
+        candidates = [index for index in interior if cells[index] == FREE and index not in keep]
+        for index in rng.sample(candidates, target - len(blocked)):
+            cells[index] = BLOCKED
@@ -0,0 +1,332 @@
+# Compact binary maze files: bit-packed records in a memory-mapped container
+#
+# A maze record is a little-endian header followed by the obstacle bits:
+#
+#   rows, cols, start row, start col, goal row, goal col   6 x uint16
+#   seed                                                   int64, -1 if unknown
+#   obstacles   rows * cols bits, row-major, least significant bit first, padded to a byte
+#
+# so a 101x101 maze takes 1296 bytes instead of a set of tuples. A container file holds any
+# number of records:
+#
+#   magic b'MZPK', version (uint16), reserved (uint16), count (uint64), table offset (uint64)
+#   records, back to back
+#   offsets table: count + 1 uint64 file offsets, record i spans offsets[i]:offsets[i + 1]
+#
+# The table goes last so MazeWriter can stream records without knowing the count up front.
+# MazeFile maps the file with mmap and hands out memoryview slices of it, so opening a corpus
+# of millions of mazes reads nothing until a maze is asked for, and worker processes opening
+# the same file share the page cache instead of receiving pickled mazes. The views are plain
+# byte buffers; where NumPy is installed, numpy.frombuffer wraps them without copying.
+#
+# Plain-text importers at the bottom read ASCII maps ('#' walls, 'S' start, 'G' goal) and
+# MovingAI benchmark .map files.
+
+import mmap
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from grid import Grid
+from maze import Maze
+
+MAGIC = b'MZPK'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sHHQQ')  # magic, version, reserved, count, table offset
+RECORD_HEADER = struct.Struct('<6Hq')   # rows, cols, start row/col, goal row/col, seed
+MAX_SIDE = 0xFFFF
+NO_SEED = -1
+
+# Header fields of one record (start and goal as (row, col), seed None if unknown)
+MazeHeader = namedtuple('MazeHeader', ['rows', 'cols', 'start', 'goal', 'seed'])
+
+# Byte value -> its 8 bits as 8 cell bytes (least significant bit first), and back
+_EXPAND = [bytes((b >> k) & 1 for k in range(8)) for b in range(256)]
+_PACK = {bits: b for b, bits in enumerate(_EXPAND)}
+
+
+# Encode a maze as one record; seed is the generator seed to store with it (None if unknown)
+def pack_maze(maze, seed=None):
+    grid = maze.grid
+    rows, cols, stride = grid.rows, grid.cols, grid.stride
+    if rows > MAX_SIDE or cols > MAX_SIDE:
+        raise ValueError(f"A {rows}x{cols} maze is too large for the format (at most {MAX_SIDE} per side)")
+    for label, pos in (('start', maze.start), ('goal', maze.goal)):
+        if not grid.in_bounds(pos):
+            raise ValueError(f"Maze {label} {pos} is outside a {rows}x{cols} grid")
+    if seed is not None and not 0 <= seed < 2 ** 63:
+        raise ValueError(f"Seed {seed} does not fit the format (0 <= seed < 2**63)")
+
+    # Interior cells row by row (one byte per cell), padded to whole bytes of bits
+    cells = grid.cells
+    flat = b''.join(cells[(r + 1) * stride + 1:(r + 1) * stride + 1 + cols] for r in range(rows))
+    flat += bytes(-len(flat) % 8)
+    bits = bytes(map(_PACK.__getitem__, (flat[i:i + 8] for i in range(0, len(flat), 8))))
+    header = RECORD_HEADER.pack(rows, cols, maze.start[0], maze.start[1], maze.goal[0], maze.goal[1],
+                                NO_SEED if seed is None else seed)
+    return header + bits
+
+# Header fields of a record (any bytes-like object, e.g. a MazeFile.record view)
+def read_header(record):
+    rows, cols, start_row, start_col, goal_row, goal_col, seed = RECORD_HEADER.unpack_from(record)
+    return MazeHeader(rows, cols, (start_row, start_col), (goal_row, goal_col), None if seed == NO_SEED else seed)
+
+# Decode a record into a Maze. If grid is given and has the record's dimensions its cells are
+# overwritten in place instead of allocating a new Grid (the returned maze then shares it).
+def unpack_maze(record, grid=None):
+    header = read_header(record)
+    rows, cols = header.rows, header.cols
+    size = (rows * cols + 7) // 8
+    with memoryview(record)[RECORD_HEADER.size:RECORD_HEADER.size + size] as bits:
+        if len(bits) != size:
+            raise ValueError(f"Truncated record: {len(bits)} of {size} obstacle bytes for a {rows}x{cols} maze")
+        flat = b''.join(map(_EXPAND.__getitem__, bits))
+    if grid is None or grid.rows != rows or grid.cols != cols:
+        grid = Grid(rows, cols)
+
+    cells, stride = grid.cells, grid.stride
+    for r in range(rows):
+        base = (r + 1) * stride + 1
+        cells[base:base + cols] = flat[r * cols:(r + 1) * cols]
+    return Maze(grid, header.start, header.goal)
+
+
+# Stream mazes into a new container file. Use as a context manager (or call close), which
+# writes the offsets table and the final count:
+#
+#   with MazeWriter('corpus.mzp') as writer:
+#       for seed in range(1000):
+#           writer.add(make_maze('kruskal', 63, 63, rng=seed), seed)
+class MazeWriter:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION, 0, 0, 0))  # Count and table are filled in on close
+        self.offsets = array('Q', [FILE_HEADER.size])
+
+    # Append a maze (seed as in pack_maze) and return its index in the file
+    def add(self, maze, seed=None):
+        record = pack_maze(maze, seed)
+        self._file.write(record)
+        self.offsets.append(self.offsets[-1] + len(record))
+        return len(self.offsets) - 2
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        table = self.offsets
+        if sys.byteorder != 'little':
+            table = array('Q', table)
+            table.byteswap()
+        self._file.write(table.tobytes())
+        self._file.seek(0)
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION, 0, len(self), self.offsets[-1]))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Write an iterable of mazes (or (maze, seed) pairs when seeds=True) to a container file
+# and return how many were written
+def write_mazes(path, mazes, seeds=False):
+    with MazeWriter(path) as writer:
+        for item in mazes:
+            if seeds:
+                writer.add(*item)
+            else:
+                writer.add(item)
+        return len(writer)
+
+
+# Read-only, memory-mapped view of a container file. Indexing decodes a Maze; record(i) and
+# header(i) read a record without decoding its obstacles. Views handed out by record() must
+# be released before close().
+class MazeFile:
+    def __init__(self, path):
+        self.path = path
+        self.buffer = self.offsets = None
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty, not a maze file") from None
+        self.buffer = memoryview(self._mmap)
+
+        if len(self.buffer) < FILE_HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is too short to be a maze file")
+        magic, version, _, count, table = FILE_HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} maze file (magic {magic!r}, version {version})")
+        end = table + 8 * (count + 1)
+        if end > len(self.buffer):
+            self.close()
+            raise ValueError(f"{path} is truncated: the offsets table ends at byte {end} of {len(self.buffer)}")
+
+        table = self.buffer[table:end]
+        if sys.byteorder == 'little':
+            self.offsets = table.cast('Q')  # Zero-copy view of the table
+        else:
+            self.offsets = array('Q', table)
+            self.offsets.byteswap()
+            table.release()
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    # Zero-copy memoryview of record i
+    def record(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(f"Maze index {i} out of range for {self.count} mazes")
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+    def header(self, i):
+        with self.record(i) as record:
+            return read_header(record)
+
+    # Decode maze i, reusing grid's storage when it has the same dimensions (see unpack_maze)
+    def load(self, i, grid=None):
+        with self.record(i) as record:
+            return unpack_maze(record, grid)
+
+    def __getitem__(self, i):
+        return self.load(i)
+
+    def __iter__(self):
+        return (self.load(i) for i in range(self.count))
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        if self.buffer is not None:
+            self.buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Plain-text importers
+# ---------------------------------------------------------------------------
+
+# Parse an ASCII map: one line per row, '#' for walls, '.' or ' ' for free cells, 'S' and 'G'
+# for the start and goal (free cells; the corners (0, 0) and (rows-1, cols-1) when absent)
+def parse_ascii(text):
+    lines = text.splitlines()
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if not lines:
+        raise ValueError("Empty ASCII map")
+    rows, cols = len(lines), max(len(line) for line in lines)
+    grid = Grid(rows, cols)
+    start = goal = None
+    for r, line in enumerate(lines):
+        for c, char in enumerate(line.ljust(cols)):  # Short lines (trailing spaces stripped) are free
+            if char == '#':
+                grid.set_blocked((r, c))
+            elif char == 'S':
+                start = (r, c)
+            elif char == 'G':
+                goal = (r, c)
+            elif char not in '. ':
+                raise ValueError(f"Unexpected character {char!r} at row {r}, column {c} of the ASCII map")
+    start = (0, 0) if start is None else start
+    goal = (rows - 1, cols - 1) if goal is None else goal
+    for label, pos in (('start', start), ('goal', goal)):
+        if not grid.is_free(pos):
+            raise ValueError(f"The {label} {pos} of the ASCII map is a wall")
+    return Maze(grid, start, goal)
+
+# Inverse of parse_ascii
+def format_ascii(maze):
+    grid = maze.grid
+    lines = []
+    for r in range(grid.rows):
+        chars = ['#' if (r, c) in grid else '.' for c in range(grid.cols)]
+        if r == maze.start[0]:
+            chars[maze.start[1]] = 'S'
+        if r == maze.goal[0]:
+            chars[maze.goal[1]] = 'G'
+        lines.append(''.join(chars))
+    return '\n'.join(lines) + '\n'
+
+# MovingAI benchmark map characters: '.', 'G' and 'S' (ground, swamp) are passable
+_MOVINGAI_FREE = frozenset('.GS')
+_MOVINGAI_BLOCKED = frozenset('@OTW')
+
+# Parse a MovingAI .map file ("type octile / height H / width W / map" then H rows).
+# Start and goal come from the scenario, not the map; by default they are the first and last
+# passable cells in row-major order.
+def parse_movingai(text, start=None, goal=None):
+    lines = text.splitlines()
+    header = {}
+    for n, line in enumerate(lines):
+        if line.strip() == 'map':
+            body = lines[n + 1:]
+            break
+        key, _, value = line.partition(' ')
+        header[key] = value.strip()
+    else:
+        raise ValueError("Not a MovingAI map: no 'map' line")
+    try:
+        rows, cols = int(header['height']), int(header['width'])
+    except (KeyError, ValueError):
+        raise ValueError("MovingAI map header needs integer height and width") from None
+    if len(body) < rows:
+        raise ValueError(f"MovingAI map has {len(body)} rows, expected {rows}")
+
+    grid = Grid(rows, cols)
+    free = []
+    for r, line in enumerate(body[:rows]):
+        if len(line) < cols:
+            raise ValueError(f"Row {r} of the MovingAI map has {len(line)} cells, expected {cols}")
+        for c, char in enumerate(line[:cols]):
+            if char in _MOVINGAI_BLOCKED:
+                grid.set_blocked((r, c))
+            elif char in _MOVINGAI_FREE:
+                free.append((r, c))
+            else:
+                raise ValueError(f"Unexpected character {char!r} at row {r}, column {c} of the MovingAI map")
+    if not free:
+        raise ValueError("MovingAI map has no passable cells")
+    start = free[0] if start is None else tuple(start)
+    goal = free[-1] if goal is None else tuple(goal)
+    for label, pos in (('start', start), ('goal', goal)):
+        if not grid.is_free(pos):
+            raise ValueError(f"The {label} {pos} is not a passable cell of the MovingAI map")
+    return Maze(grid, start, goal)
+
+def load_ascii(path):
+    with open(path) as f:
+        return parse_ascii(f.read())
+
+def load_movingai(path, start=None, goal=None):
+    with open(path) as f:
+        return parse_movingai(f.read(), start, goal)
+
+# Load a text map, picking the parser by extension (.map is MovingAI, anything else ASCII)
+def load_text_map(path):
+    return load_movingai(path) if path.endswith('.map') else load_ascii(path)
+
+
+if __name__ == "__main__":
+    # Pack text maps into one container: python maze_file.py corpus.mzp maps/*.map level.txt
+    if len(sys.argv) < 3:
+        sys.exit("usage: python maze_file.py OUTPUT INPUT...")
+    count = write_mazes(sys.argv[1], (load_text_map(path) for path in sys.argv[2:]))
+    print(f"Wrote {count} mazes to {sys.argv[1]}")
@@ -0,0 +1,150 @@
+# Batched pathfinding for many agents in one maze
+#
+# route_agents takes many (start, goal) pairs for a single grid. Work shared between agents is
+# done once: agents heading for the same goal share one BFS distance field (each path is then a
+# walk down the field), and the paths come back packed into one PathBatch instead of a list of
+# lists. With reserve=True the agents are routed cooperatively: each one plans in space-time
+# around the cells and moves reserved by the agents planned before it, so no two paths collide.
+
+import heapq
+from array import array
+from collections import defaultdict
+from reachability import distance_field, UNREACHABLE
+from distance_oracle import gradient_cells
+from a_star import solve_astar
+
+
+# Paths of a batch of agents in CSR layout: the path of agent i is the flat cell indices
+# cells[offsets[i]:offsets[i + 1]] (an empty slice if it has no path). In reservation mode
+# index k of a path is the agent's cell at time step k, so waiting repeats a cell.
+class PathBatch:
+    __slots__ = ('grid', 'offsets', 'cells')
+
+    def __init__(self, grid, offsets, cells):
+        self.grid = grid
+        self.offsets = offsets  # array('i'), one more entry than there are agents
+        self.cells = cells      # array('i') of all paths back to back
+
+    # Flat cell indices of agent i's path
+    def indices(self, i):
+        return self.cells[self.offsets[i]:self.offsets[i + 1]]
+
+    # Agent i's path as (row, col) positions
+    def path(self, i):
+        return [self.grid.position(cell) for cell in self.indices(i)]
+
+    # Number of moves (time steps in reservation mode) in agent i's path, or None if it has none
+    def cost(self, i):
+        length = self.offsets[i + 1] - self.offsets[i]
+        return length - 1 if length else None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.path(i)
+
+    def __iter__(self):
+        return (self.path(i) for i in range(len(self)))
+
+
+# Route every (start, goal) pair through grid and return a PathBatch in input order.
+# Without reserve, each agent gets a shortest path and ignores the others: agents sharing a goal
+# walk down that goal's distance field (built once), the rest run A*. With reserve, agents are
+# planned one after another, in input order, around the earlier agents' reservations; an agent
+# may wait and detour up to max_delay steps beyond its shortest distance (default rows + cols).
+def route_agents(grid, pairs, reserve=False, max_delay=None):
+    pairs = list(pairs)
+    if reserve:
+        paths = _route_reserved(grid, pairs, grid.rows + grid.cols if max_delay is None else max_delay)
+    else:
+        paths = _route_independent(grid, pairs)
+
+    offsets = array('i', [0])
+    cells = array('i')
+    for path in paths:
+        cells.extend(path)
+        offsets.append(len(cells))
+    return PathBatch(grid, offsets, cells)
+
+# Group agent numbers by goal, in order of first appearance
+def _agents_by_goal(pairs):
+    groups = defaultdict(list)
+    for i, (_, goal) in enumerate(pairs):
+        groups[goal].append(i)
+    return groups
+
+# Independent shortest paths, one distance field per goal shared by two or more agents
+def _route_independent(grid, pairs):
+    paths = [None] * len(pairs)
+    for goal, agents in _agents_by_goal(pairs).items():
+        if len(agents) == 1:
+            start = pairs[agents[0]][0]
+            paths[agents[0]] = [grid.index(pos) for pos in solve_astar(grid, start, goal).path]
+            continue
+        field = distance_field(grid, goal)  # Only one field is alive at a time
+        for i in agents:
+            paths[i] = gradient_cells(grid, field, grid.index(pairs[i][0]))
+    return paths
+
+# Cooperative routing: space-time A* per agent against a reservation table
+def _route_reserved(grid, pairs, max_delay):
+    fields = {}        # goal -> distance field, the exact heuristic for every agent with that goal
+    reserved = set()   # (cell, time) pairs taken by earlier agents
+    moves = set()      # (from cell, to cell, time) moves taken by earlier agents, to rule out swaps
+    parked = {}        # Cell -> time from which an agent that finished there occupies it for good
+    last_use = {}      # Cell -> last time step any earlier path occupies it
+    paths = []
+    for start, goal in pairs:
+        field = fields.get(goal)
+        if field is None:
+            field = fields[goal] = distance_field(grid, goal)
+        path = _space_time_search(grid, grid.index(start), grid.index(goal), field,
+                                  reserved, moves, parked, last_use, max_delay)
+        for t, cell in enumerate(path):
+            reserved.add((cell, t))
+            last_use[cell] = max(last_use.get(cell, -1), t)
+            if t and path[t - 1] != cell:
+                moves.add((path[t - 1], cell, t - 1))
+        if path:
+            parked[path[-1]] = len(path) - 1
+        paths.append(path)
+    return paths
+
+# Space-time A* over (cell, time) states with wait moves. The goal test also requires that no
+# earlier agent passes through the goal later, since the agent stays there once it arrives.
+def _space_time_search(grid, start, goal, field, reserved, moves, parked, last_use, max_delay):
+    if field[start] == UNREACHABLE:
+        return []
+    cells = grid.cells
+    steps = grid.offsets + (0,)  # Four moves plus waiting in place
+    horizon = field[start] + max_delay
+    never = horizon + 1
+
+    heap = [(field[start], field[start], 0, start)]  # (f, h, time, cell): ties go to the lower h
+    parents = {(start, 0): None}
+    while heap:
+        _, _, t, cell = heapq.heappop(heap)
+        if cell == goal and t > last_use.get(cell, -1):
+            path = []
+            state = (cell, t)
+            while state is not None:
+                path.append(state[0])
+                state = parents[state]
+            return path[::-1]
+        if t >= horizon:
+            continue
+
+        next_t = t + 1
+        for step in steps:
+            neighbor = cell + step
+            if cells[neighbor] or field[neighbor] == UNREACHABLE or (neighbor, next_t) in parents:
+                continue
+            if (neighbor, next_t) in reserved or parked.get(neighbor, never) <= next_t:
+                continue  # Another agent is (or has settled) there
+            if step and (neighbor, cell, t) in moves:
+                continue  # Would swap places with another agent
+            parents[(neighbor, next_t)] = (cell, t)
+            h = field[neighbor]
+            heapq.heappush(heap, (next_t + h, h, next_t, neighbor))
+    return []
@@ -0,0 +1,263 @@
+# Streaming maze pipeline: generate -> validate -> solve -> record
+#
+#   python pipeline.py --count 10000000 --rows 20 --cols 20 --obstacles 80 --output runs.jsonl \
+#                      --checkpoint runs.ckpt --workers 4
+#
+# Every stage is a generator that pulls one item at a time from the stage before it, so a run
+# over millions of seeds holds only the mazes in flight. Seed s gives the same maze every run
+# (with --obstacles it is the first candidate random_maze(rng=s) would try, which may be
+# unsolvable; with --generator it is make_maze(kind, rng=s)). Results go to disk as JSON lines
+# in seed order, one per seed.
+#
+# Backpressure comes from pulling: nothing is generated until the record stage asks for it.
+# Where stages run concurrently (a process pool for the CPU work, a thread feeding the writer)
+# they are connected by bounded queues, so a fast producer blocks instead of piling up results.
+# With a checkpoint file the run can be stopped at any point and resumed from the last
+# checkpointed seed: the output is cut back to the checkpoint and generation restarts there.
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from grid import Grid
+from maze import Maze, GENERATORS, make_maze, sample_obstacles, is_solvable
+from batch import SOLVERS, get_solver, solve_one
+
+# Everything that determines a run's output apart from the seeds (picklable, sent to workers)
+PipelineConfig = namedtuple('PipelineConfig', ['rows', 'cols', 'num_obstacles', 'kind', 'density',
+                                               'start', 'goal', 'algorithm'])
+
+# Columns of a result record (one JSON object per seed)
+FIELDS = ['seed', 'obstacles', 'solvable', 'cost', 'expanded', 'pushed', 'seconds']
+
+
+# Build a PipelineConfig. Give num_obstacles for random obstacles (sample_obstacles) or kind
+# (and optionally density) for one of maze.GENERATORS; goal defaults to the bottom-right corner.
+def make_config(rows, cols, num_obstacles=None, kind=None, density=None, start=(0, 0), goal=None, algorithm='astar'):
+    if (num_obstacles is None) == (kind is None):
+        raise ValueError("Give either num_obstacles (random obstacles) or kind (a maze generator)")
+    if kind is not None and kind not in GENERATORS:
+        raise ValueError(f"Unknown generator {kind!r}; expected one of {sorted(GENERATORS)}")
+    get_solver(algorithm)
+    goal = (rows - 1, cols - 1) if goal is None else goal
+    return PipelineConfig(rows, cols, num_obstacles, kind, density, tuple(start), tuple(goal), algorithm)
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+# The maze for one seed
+def generate_maze(config, seed):
+    if config.kind is not None:
+        return make_maze(config.kind, config.rows, config.cols, config.density, config.start, config.goal, rng=seed)
+    obstacles = sample_obstacles(config.start, config.goal, config.rows, config.cols, config.num_obstacles, seed)
+    return Maze(Grid(config.rows, config.cols, obstacles), config.start, config.goal)
+
+# Stage 1: (seed, maze) for every seed
+def generate(config, seeds):
+    for seed in seeds:
+        yield seed, generate_maze(config, seed)
+
+# Stage 2: (seed, maze, solvable), checked with reachability.is_reachable
+def validate(items):
+    for seed, maze in items:
+        yield seed, maze, is_solvable(maze.start, maze.goal, maze.grid, maze.rows, maze.cols)
+
+# Stage 3: one result record (a dict keyed by FIELDS) per item; unsolvable mazes are not searched
+def solve(items, algorithm):
+    for seed, maze, solvable in items:
+        record = {'seed': seed, 'obstacles': len(maze.grid), 'solvable': solvable,
+                  'cost': None, 'expanded': None, 'pushed': None, 'seconds': None}
+        if solvable:
+            result, seconds = solve_one(maze, algorithm)
+            record.update(cost=result.cost, expanded=result.expanded, pushed=result.pushed, seconds=seconds)
+        yield record
+
+# Stages 1-3 for one seed range (the unit of work of a pool worker)
+def process_seeds(config, seeds):
+    return list(solve(validate(generate(config, seeds)), config.algorithm))
+
+
+# Run fn over items on a process pool and yield the results in input order. At most max_pending
+# calls are in flight: once that many are queued, no more items are pulled until the oldest
+# finishes, so a slow consumer throttles the whole pool.
+def parallel_map(fn, items, workers, max_pending=None):
+    max_pending = max_pending or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# Run a stage in a background thread that feeds a bounded queue of maxsize items, so it keeps
+# working while the consumer is busy (e.g. writing to disk) but never gets further ahead than
+# that. Exceptions in the stage are re-raised in the consumer; closing the consumer stops it.
+def buffered(items, maxsize=64):
+    channel = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(message):
+        while not stop.is_set():
+            try:
+                channel.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except BaseException as error:
+            put((False, error))
+        finally:
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            is_item, value = channel.get()
+            if is_item:
+                yield value
+            elif value is None:
+                return
+            else:
+                raise value
+    finally:
+        stop.set()
+        thread.join()
+
+
+# Stages 1-3 for seeds first..end-1: in this process, or on a pool of worker processes that
+# take chunksize seeds at a time (with at most queue_size chunks in flight)
+def results(config, first, end, workers=1, chunksize=256, queue_size=16):
+    seeds = range(first, end)
+    if workers <= 1:
+        yield from solve(validate(generate(config, seeds)), config.algorithm)
+        return
+    chunks = (seeds[i:i + chunksize] for i in range(0, len(seeds), chunksize))
+    for records in buffered(parallel_map(partial(process_seeds, config), chunks, workers, queue_size), queue_size):
+        yield from records
+
+
+# ---------------------------------------------------------------------------
+# Record stage, checkpoints and the driver
+# ---------------------------------------------------------------------------
+
+# Last checkpoint of a run: the next seed to process and the output size when it was taken
+def read_checkpoint(path):
+    with open(path) as f:
+        return json.load(f)
+
+# Write a checkpoint atomically (a crash leaves either the old or the new one)
+def write_checkpoint(path, checkpoint):
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+# Run the pipeline for seeds first..first+count-1 and append one JSON line per seed to output.
+# With a checkpoint path, progress is saved every checkpoint_every seeds (and at the end); with
+# resume=True an existing checkpoint for the same config and seed range is picked up, the output
+# is cut back to its size and the run continues from its next seed. Returns a dict of totals for
+# the seeds processed by this call.
+def run_pipeline(config, output, count, first=0, workers=1, chunksize=256, queue_size=16,
+                 checkpoint=None, checkpoint_every=10000, resume=False):
+    end = first + count
+    start_seed, size = first, 0
+    if resume and checkpoint and os.path.exists(checkpoint):
+        saved = read_checkpoint(checkpoint)
+        if saved['config'] != list(map(_jsonable, config)) or saved['first'] != first or saved['end'] != end:
+            raise ValueError(f"Checkpoint {checkpoint} belongs to a different run; remove it or match its settings")
+        start_seed, size = saved['next_seed'], saved['output_bytes']
+
+    totals = {'mazes': 0, 'solvable': 0, 'expanded': 0, 'cost': 0}
+    mode = 'r+b' if size else 'wb'
+    with open(output, mode) as out:
+        out.truncate(size)  # Drop lines written after the checkpoint
+        out.seek(size)
+
+        def save(next_seed):
+            if checkpoint:
+                out.flush()
+                os.fsync(out.fileno())
+                write_checkpoint(checkpoint, {'config': list(map(_jsonable, config)), 'first': first, 'end': end,
+                                              'next_seed': next_seed, 'output_bytes': out.tell()})
+
+        for record in results(config, start_seed, end, workers, chunksize, queue_size):
+            out.write(json.dumps(record).encode() + b'\n')
+            totals['mazes'] += 1
+            if record['solvable']:
+                totals['solvable'] += 1
+                totals['expanded'] += record['expanded']
+                totals['cost'] += record['cost']
+            if totals['mazes'] % checkpoint_every == 0:
+                save(record['seed'] + 1)
+        save(end)
+    return totals
+
+def _jsonable(value):
+    return list(value) if isinstance(value, tuple) else value
+
+# Read the records of an output file back, one dict per line
+def read_results(path):
+    with open(path) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _position(text):
+    row, _, col = text.partition(',')
+    return int(row), int(col)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate, validate, solve and record mazes as a stream.")
+    parser.add_argument('--count', type=int, required=True, help="number of seeds to run")
+    parser.add_argument('--first', type=int, default=0, help="first seed")
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--cols', type=int, default=20)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--obstacles', type=int, help="random obstacles per maze")
+    source.add_argument('--generator', choices=sorted(GENERATORS), help="maze generator instead of random obstacles")
+    parser.add_argument('--density', type=float, help="blocked fraction for --generator")
+    parser.add_argument('--start', type=_position, default=(0, 0), help="start as ROW,COL")
+    parser.add_argument('--goal', type=_position, help="goal as ROW,COL (default bottom-right)")
+    parser.add_argument('--solver', default='astar', choices=list(SOLVERS))
+    parser.add_argument('--output', required=True, help="JSON lines file for the results")
+    parser.add_argument('--checkpoint', help="checkpoint file; an existing one is resumed")
+    parser.add_argument('--checkpoint-every', type=int, default=10000, help="seeds between checkpoints")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (1 runs everything in this process)")
+    parser.add_argument('--chunksize', type=int, default=256, help="seeds per worker task")
+    parser.add_argument('--queue-size', type=int, default=16, help="worker tasks in flight")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = make_config(args.rows, args.cols, args.obstacles, args.generator, args.density,
+                         args.start, args.goal, args.solver)
+    totals = run_pipeline(config, args.output, args.count, args.first, args.workers, args.chunksize,
+                          args.queue_size, args.checkpoint, args.checkpoint_every, resume=bool(args.checkpoint))
+    print(f"{totals['mazes']} mazes, {totals['solvable']} solvable, {totals['expanded']} nodes expanded, "
+          f"results in {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
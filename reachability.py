@@ -0,0 +1,142 @@
+# Reachability (bitboard flood fill with a BFS fallback) and BFS distance fields
+
+from array import array
+from grid import FREE_TO_DIGIT
+
+# Bitboards use the Grid's own flat cell indices: bit i is set iff cell index i is free.
+# The blocked border of every Grid means a shift by 1 or by the row stride can never
+# wrap from one row into the next, so a whole frontier grows with a handful of shifts.
+#
+# Each flood step costs O(cells / word size) however few cells it adds, so the flood only pays
+# off while the number of steps stays small. Open and random grids converge in about
+# max(rows, cols) steps, but maze-like grids need a step for every turn of their winding paths.
+# The flood therefore stops after rows + cols steps and a linear BFS over the cell bytes
+# answers instead, so a maze-like grid wastes at most those steps on top of the BFS.
+
+_FLAG_TO_DIGIT = bytes.maketrans(b'\x00\x01', b'01')   # reached flag -> '1', else '0'
+_DIGIT_TO_FLAG = bytes.maketrans(b'01', b'\x00\x01')   # '1' -> 1 (reached), '0' -> 0
+
+UNREACHABLE = -1  # Distance value for cells that cannot be reached
+
+
+# Pack padded cell bytes into an integer with one bit per free cell (lowest bit = cell index 0)
+def _pack_free(cells):
+    return int(cells.translate(FREE_TO_DIGIT)[::-1], 2)
+
+# Unpack the low `size` bits of an integer into a bytearray of 0/1 flags
+def _unpack(bits, size):
+    digits = format(bits, 'b')[::-1].ljust(size, '0')
+    return bytearray(digits.encode().translate(_DIGIT_TO_FLAG))
+
+
+# Free cells of a grid as a bitboard
+def free_mask(grid):
+    return _pack_free(grid.cells)
+
+# Flood steps allowed before falling back to BFS (see the comment at the top)
+def _step_limit(grid):
+    return grid.rows + grid.cols
+
+# Grow `reached` through `free` until it stops changing or covers every bit in `target`.
+# Returns None if that takes more than `limit` steps.
+def _flood(reached, free, stride, target=0, limit=None):
+    steps = 0
+    while limit is None or steps < limit:
+        steps += 1
+        grown = (reached | (reached >> 1) | (reached << stride) | (reached >> stride)) & free
+        # Adding the free mask carries each reached bit to the right end of its run of free cells,
+        # so a whole horizontal corridor is filled in one step instead of one cell per step
+        grown |= ((grown + free) ^ free) & free
+        if grown == reached or (target and grown & target == target):
+            return grown
+        reached = grown
+    return None
+
+# Linear BFS over the cell bytes: 0/1 flags (indexed like grid.cells) of the cells reachable
+# from cell index start, stopping early once cell index goal is reached
+def _bfs(grid, start, goal=-1):
+    cells, offsets = grid.cells, grid.offsets
+    reached = bytearray(len(cells))
+    if cells[start]:
+        return reached
+    reached[start] = 1
+    frontier = [start]
+    while frontier and not reached[goal]:
+        next_frontier = []
+        for index in frontier:
+            for offset in offsets:
+                neighbor = index + offset
+                if not reached[neighbor] and not cells[neighbor]:
+                    reached[neighbor] = 1
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return reached
+
+
+# Bitboard of every cell reachable from start (empty if start is blocked)
+def reachable_mask(grid, start):
+    free = free_mask(grid)
+    seed = (1 << grid.index(start)) & free
+    if not seed:
+        return 0
+    mask = _flood(seed, free, grid.stride, limit=_step_limit(grid))
+    if mask is None:
+        mask = int(_bfs(grid, grid.index(start)).translate(_FLAG_TO_DIGIT)[::-1], 2)
+    return mask
+
+# Reachable cells from start as a bytearray of 0/1 flags indexed like grid.cells
+def reachable(grid, start):
+    free = free_mask(grid)
+    seed = (1 << grid.index(start)) & free
+    if not seed:
+        return bytearray(len(grid.cells))
+    mask = _flood(seed, free, grid.stride, limit=_step_limit(grid))
+    if mask is None:
+        return _bfs(grid, grid.index(start))
+    return _unpack(mask, len(grid.cells))
+
+# Check whether goal can be reached from start, stopping as soon as the flood touches the goal
+def is_reachable(grid, start, goal):
+    free = free_mask(grid)
+    seed = (1 << grid.index(start)) & free
+    target = (1 << grid.index(goal)) & free
+    if not seed or not target:
+        return False
+    mask = _flood(seed, free, grid.stride, target, _step_limit(grid))
+    if mask is None:
+        goal_index = grid.index(goal)
+        return bool(_bfs(grid, grid.index(start), goal_index)[goal_index])
+    return bool(mask & target)
+
+
+# Check a stack of candidate mazes: returns one bool per maze, in input order.
+# This is a loop over is_reachable, not a batched flood: packing all K into one board (their
+# blocked border rows keep them apart) was measured slower, since the whole board must be
+# shifted until the slowest maze finishes.
+def solvable_batch(mazes):
+    return [is_reachable(maze.grid, maze.start, maze.goal) for maze in mazes]
+
+
+# Full BFS distance field from source: array of step counts indexed like grid.cells,
+# UNREACHABLE for blocked or disconnected cells
+def distance_field(grid, source):
+    cells, offsets = grid.cells, grid.offsets
+    dist = array('i', [UNREACHABLE]) * len(cells)
+    source_index = grid.index(source)
+    if cells[source_index]:
+        return dist
+
+    dist[source_index] = 0
+    frontier = [source_index]
+    d = 0
+    while frontier:
+        d += 1
+        next_frontier = []
+        for index in frontier:
+            for offset in offsets:
+                neighbor = index + offset
+                if dist[neighbor] == UNREACHABLE and not cells[neighbor]:
+                    dist[neighbor] = d
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return dist
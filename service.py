@@ -0,0 +1,428 @@
+# Asyncio maze-solving service: JSON lines over TCP (or a Unix socket)
+#
+#   python service.py serve --port 8765 --workers 4
+#   python service.py loadtest --port 8765 --requests 5000 --concurrency 64
+#   python service.py loadtest --local            # starts its own server in this process
+#
+# Each request is one JSON object per line, answered by one line with the same id (answers
+# may come back in any order):
+#
+#   {"id": 1, "maze": {"rows": 5, "cols": 6, "obstacles": [[0, 1], [2, 3]]},
+#    "start": [0, 0], "goal": [4, 5], "algorithm": "astar"}
+#   {"id": 1, "path": [[0, 0], [1, 0], ...], "cost": 9, "expanded": 12, "pushed": 17, "cached": false}
+#
+# algorithm is any name in batch.SOLVERS (A*, JPS, both bidirectional searches, backward
+# chaining); failures come back as {"id": ..., "error": "..."}. Solving runs on a process pool
+# so the event loop only parses and routes. Requests for the same maze that arrive within a
+# short window are micro-batched into one pool task, so the maze crosses the process boundary
+# and is decoded once for all of them. Results are kept in an LRU cache keyed by
+# (maze hash, algorithm, start, goal), and identical requests already in flight share one solve.
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from grid import Grid
+from maze import Maze, GENERATORS, make_maze
+from batch import SOLVERS, get_solver, encode_maze, decode_maze
+
+DEFAULT_PORT = 8765
+LINE_LIMIT = 16 * 1024 * 1024  # Longest request line accepted (large mazes list many obstacles)
+MAX_CELLS = 4 * 1024 * 1024    # Largest maze (rows * cols) a request may ask for
+
+
+# Maze as the JSON object used in requests
+def maze_to_json(maze):
+    return {'rows': maze.rows, 'cols': maze.cols, 'obstacles': [list(pos) for pos in maze.grid]}
+
+# Grid from a request's maze object
+def grid_from_json(data):
+    try:
+        rows, cols, obstacles = data['rows'], data['cols'], data['obstacles']
+    except (KeyError, TypeError):
+        raise ValueError("maze needs rows, cols and obstacles") from None
+    if not (_is_int(rows) and _is_int(cols) and rows > 0 and cols > 0):
+        raise ValueError("maze rows and cols must be positive integers")
+    if rows * cols > MAX_CELLS:
+        raise ValueError(f"maze has {rows * cols} cells, more than the limit of {MAX_CELLS}")
+    if not isinstance(obstacles, list):
+        raise ValueError("maze obstacles must be a list of [row, col] pairs")
+    grid = Grid(rows, cols)
+    for pos in obstacles:
+        grid.set_blocked(_position(pos, 'obstacle'))
+    return grid
+
+# JSON integers only: bool is a subclass of int in Python but true/false are not coordinates
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _position(value, label):
+    if not (isinstance(value, (list, tuple)) and len(value) == 2 and all(_is_int(v) for v in value)):
+        raise ValueError(f"{label} must be a [row, col] pair, got {value!r}")
+    return tuple(value)
+
+# Content hash of a grid (dimensions and cells), identifying a maze for batching and caching
+def grid_hash(grid):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{grid.rows}x{grid.cols}:".encode())
+    digest.update(grid.cells)
+    return digest.hexdigest()
+
+
+# Worker entry point: decode one maze and answer every (algorithm, start, goal) query on it.
+# Each answer is ('ok', SearchResult) or ('error', message), so one bad query fails alone.
+def solve_queries(encoded, queries):
+    maze = decode_maze(encoded)
+    answers = []
+    for algorithm, start, goal in queries:
+        try:
+            answers.append(('ok', get_solver(algorithm)(maze.grid, start, goal)))
+        except Exception as error:
+            answers.append(('error', f"{type(error).__name__}: {error}"))
+    return answers
+
+
+# Queries waiting to be sent to the pool for one maze
+class _Batch:
+    __slots__ = ('encoded', 'keys', 'queries')
+
+    def __init__(self, encoded):
+        self.encoded = encoded
+        self.keys = []      # Cache keys, in query order
+        self.queries = []   # (algorithm, start, goal)
+
+
+# The solving side of the service, independent of the transport. executor defaults to a
+# process pool of `workers` processes; batch_window is how long (in seconds) the first query
+# for a maze waits for others to join its batch, and max_batch flushes a batch early.
+class MazeService:
+    def __init__(self, workers=None, cache_size=4096, batch_window=0.002, max_batch=64, executor=None):
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._owns_executor = executor is None
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache = OrderedDict()  # (maze hash, algorithm, start, goal) -> SearchResult, most recent last
+        self.in_flight = {}         # Same key -> future of a solve already queued or running
+        self.batches = {}           # Maze hash -> _Batch still collecting queries
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'batches': 0, 'solved': 0, 'errors': 0}
+
+    # Solve one query and return its SearchResult (and whether it came from the cache).
+    # Raises ValueError for bad positions or algorithm names, RuntimeError if the solver failed.
+    async def solve(self, grid, start, goal, algorithm='astar', maze_hash=None):
+        get_solver(algorithm)
+        for label, pos in (('start', start), ('goal', goal)):
+            if not grid.is_free(pos):
+                raise ValueError(f"{label} {pos} is not a free cell of the {grid.rows}x{grid.cols} maze")
+        maze_hash = maze_hash or grid_hash(grid)
+        key = (maze_hash, algorithm, start, goal)
+        self.stats['requests'] += 1
+
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return result, True
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future), False
+
+        loop = asyncio.get_running_loop()
+        future = self.in_flight[key] = loop.create_future()
+        batch = self.batches.get(maze_hash)
+        if batch is None:
+            batch = self.batches[maze_hash] = _Batch(encode_maze(Maze(grid, start, goal)))
+            loop.call_later(self.batch_window, self._flush, maze_hash, batch)
+        batch.keys.append(key)
+        batch.queries.append((algorithm, start, goal))
+        if len(batch.queries) >= self.max_batch:
+            self._flush(maze_hash, batch)
+        return await asyncio.shield(future), False
+
+    # Send a maze's collected queries to the pool (no-op if that batch was already sent)
+    def _flush(self, maze_hash, batch):
+        if self.batches.get(maze_hash) is not batch:
+            return
+        del self.batches[maze_hash]
+        self.stats['batches'] += 1
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, solve_queries, batch.encoded, batch.queries)
+        task.add_done_callback(lambda done: self._finish(batch.keys, done))
+
+    # Hand a finished pool task's answers to the waiting futures and the cache
+    def _finish(self, keys, done):
+        error = RuntimeError("solver pool shut down") if done.cancelled() else done.exception()
+        answers = [('error', f"{type(error).__name__}: {error}")] * len(keys) if error else done.result()
+        for key, (status, value) in zip(keys, answers):
+            future = self.in_flight.pop(key)
+            if status == 'ok':
+                self.stats['solved'] += 1
+                self._remember(key, value)
+                future.set_result(value)
+            else:
+                self.stats['errors'] += 1
+                future.set_exception(RuntimeError(value))
+
+    def _remember(self, key, result):
+        if self.cache_size <= 0:
+            return
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    # Answer one decoded request object with a response object. Every failure, including
+    # unexpected ones, becomes an "error" field, so no request goes unanswered.
+    async def handle(self, request):
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            grid = grid_from_json(request.get('maze'))
+            start = _position(request.get('start'), 'start')
+            goal = _position(request.get('goal'), 'goal')
+            algorithm = request.get('algorithm', 'astar')
+            if not isinstance(algorithm, str):
+                raise ValueError(f"algorithm must be a string, got {algorithm!r}")
+            result, cached = await self.solve(grid, start, goal, algorithm)
+        except (ValueError, RuntimeError) as error:
+            return {'id': request_id, 'error': str(error)}
+        except Exception as error:
+            return {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+        return {'id': request_id, 'path': [list(pos) for pos in result.path], 'cost': result.cost,
+                'expanded': result.expanded, 'pushed': result.pushed, 'cached': cached}
+
+    # Serve one connection: requests are handled concurrently (at most max_pending at a time)
+    # and each response is written as soon as it is ready
+    async def serve_connection(self, reader, writer, max_pending=256):
+        slots = asyncio.Semaphore(max_pending)
+        tasks = set()
+
+        async def answer(line):
+            try:
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'id': None, 'error': "invalid JSON"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await slots.acquire()  # Backpressure: stop reading while too many requests are open
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, ValueError):
+            pass  # Client went away, or sent a line over LINE_LIMIT
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()  # Server shutting down: drop the connection quietly
+        finally:
+            writer.close()
+
+    # Start listening on host:port, or on a Unix socket at path; returns the asyncio server
+    async def start_server(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        if path is not None:
+            return await asyncio.start_unix_server(self.serve_connection, path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.serve_connection, host, port, limit=LINE_LIMIT)
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Client and load test
+# ---------------------------------------------------------------------------
+
+# Client for one connection; any number of requests may be outstanding at once
+class ServiceClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}  # Request id -> future of its response
+        self.next_id = 0
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+
+    # Send a request object (its id is assigned here) and return the response object
+    async def request(self, request):
+        self.next_id += 1
+        request = dict(request, id=self.next_id)
+        future = self.waiting[self.next_id] = asyncio.get_running_loop().create_future()
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def solve(self, maze_json, start, goal, algorithm='astar'):
+        return await self.request({'maze': maze_json, 'start': list(start), 'goal': list(goal),
+                                   'algorithm': algorithm})
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self._receiver
+
+
+# Latency at quantile q (0..1) of a sorted list
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+# Seeded request mix: queries between random free cells of a few generated mazes, with
+# algorithms drawn from the given names and some queries repeated (to exercise the cache)
+def make_workload(requests, mazes=8, size=21, algorithms=('astar', 'bidirectional_astar', 'backward_chaining'),
+                  repeat=0.2, seed=0):
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(mazes):
+        maze = make_maze(sorted(GENERATORS)[i % len(GENERATORS)], size, size, rng=seed * 1000 + i)
+        free = [(r, c) for r in range(size) for c in range(size) if maze.grid.is_free((r, c))]
+        corpus.append((maze_to_json(maze), free))
+    workload = []
+    for _ in range(requests):
+        if workload and rng.random() < repeat:
+            workload.append(rng.choice(workload))
+            continue
+        maze_json, free = rng.choice(corpus)
+        workload.append((maze_json, rng.choice(free), rng.choice(free), rng.choice(algorithms)))
+    return workload
+
+# Send the workload over `connections` connections with `concurrency` requests in flight in
+# total; returns a report dict with throughput and latency percentiles (in milliseconds)
+async def load_test(workload, host='127.0.0.1', port=DEFAULT_PORT, path=None, concurrency=64, connections=4):
+    clients = [await ServiceClient.connect(host, port, path) for _ in range(connections)]
+    latencies = []
+    counts = {'errors': 0, 'cached': 0}
+    items = iter(enumerate(workload))
+
+    async def run(client):
+        for i, (maze_json, start, goal, algorithm) in items:
+            started = time.perf_counter()
+            response = await client.solve(maze_json, start, goal, algorithm)
+            latencies.append(time.perf_counter() - started)
+            if 'error' in response:
+                counts['errors'] += 1
+            elif response['cached']:
+                counts['cached'] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(clients[i % connections]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.close()
+
+    latencies.sort()
+    return {'requests': len(latencies), 'seconds': elapsed, 'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 0.50) * 1000, 'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000 if latencies else 0.0, **counts}
+
+def print_report(report):
+    print(f"{report['requests']} requests in {report['seconds']:.2f}s: {report['throughput']:.0f} req/s, "
+          f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms, "
+          f"{report['cached']} cached, {report['errors']} errors")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Maze-solving service (JSON lines over TCP) and its load test.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="run the service")
+    test = commands.add_parser('loadtest', help="measure latency and throughput of a running service")
+    for command in (serve, test):
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int, default=DEFAULT_PORT)
+        command.add_argument('--unix', help="Unix socket path instead of TCP")
+    for command in (serve, test):
+        command.add_argument('--workers', type=int, help="solver processes (default: CPU count)")
+        command.add_argument('--cache-size', type=int, default=4096)
+        command.add_argument('--batch-window', type=float, default=0.002, help="seconds a batch waits for more queries")
+    test.add_argument('--local', action='store_true', help="start a service in this process and test it")
+    test.add_argument('--requests', type=int, default=2000)
+    test.add_argument('--concurrency', type=int, default=64)
+    test.add_argument('--connections', type=int, default=4)
+    test.add_argument('--mazes', type=int, default=8)
+    test.add_argument('--size', type=int, default=21)
+    test.add_argument('--algorithms', nargs='+', default=['astar', 'bidirectional_astar', 'backward_chaining'],
+                      choices=list(SOLVERS))
+    test.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+async def _serve(args):
+    service = MazeService(args.workers, args.cache_size, args.batch_window)
+    server = await service.start_server(args.host, args.port, args.unix)
+    print(f"Serving on {args.unix or f'{args.host}:{args.port}'}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+async def _load_test(args):
+    workload = make_workload(args.requests, args.mazes, args.size, args.algorithms, seed=args.seed)
+    service = server = None
+    if args.local:
+        service = MazeService(args.workers, args.cache_size, args.batch_window)
+        server = await service.start_server(args.host, args.port, args.unix)
+    try:
+        report = await load_test(workload, args.host, args.port, args.unix, args.concurrency, args.connections)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            service.close()
+    print_report(report)
+    if service is not None:
+        print("Service:", service.stats)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(_serve(args) if args.command == 'serve' else _load_test(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,43 +1,168 @@
 # History management (for step/back functionality)
+#
+# Rather than deep-copying every search structure on each Step, the GUIs build their heap,
+# sets and dicts as tracked containers bound to a History. Every change made through them is
+# written to the undo log of the current step, so Back only replays that step's changes in
+# reverse: a step costs O(its changes) to record and to undo, and the whole history costs
+# O(total changes).
 
-import copy  # Used to create deep copies of data structures to preserve their state
+import heapq
 
-# Save the current state of the search
+# Step history: one frame per saved step, holding the values passed to save_state plus the
+# undo log of every tracked change made since
+class History:
+    def __init__(self):
+        self.frames = []  # (saved values, undo log) per step
+
+    # Start a new step, remembering the values to hand back when it is undone
+    def save(self, values):
+        self.frames.append((values, []))
+
+    # Add an undo operation (function and arguments) to the current step
+    def record(self, undo, *args):
+        if self.frames:
+            self.frames[-1][1].append((undo, args))
+
+    # Revert the most recent step and return the values saved when it started
+    def undo(self):
+        values, log = self.frames.pop()
+        for undo, args in reversed(log):
+            undo(*args)
+        return values
+
+    def __len__(self):
+        return len(self.frames)
+
+
+# Set that logs additions and removals to a History
+class TrackedSet(set):
+    def __init__(self, history, items=()):
+        super().__init__(items)
+        self.history = history
+
+    def add(self, item):
+        if item not in self:
+            set.add(self, item)
+            self.history.record(set.discard, self, item)
+
+    def discard(self, item):
+        if item in self:
+            set.discard(self, item)
+            self.history.record(set.add, self, item)
+
+    def remove(self, item):
+        set.remove(self, item)
+        self.history.record(set.add, self, item)
+
+
+_MISSING = object()  # Marks a key that did not exist before an assignment
+
+# Put a dict entry back to an earlier value, or delete it if it did not exist
+def _restore_item(d, key, value):
+    if value is _MISSING:
+        dict.pop(d, key, None)
+    else:
+        dict.__setitem__(d, key, value)
+
+# Dict that logs assignments and deletions to a History
+class TrackedDict(dict):
+    def __init__(self, history, items=()):
+        super().__init__(items)
+        self.history = history
+
+    def __setitem__(self, key, value):
+        self.history.record(_restore_item, self, key, dict.get(self, key, _MISSING))
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        value = dict.pop(self, key)
+        self.history.record(dict.__setitem__, self, key, value)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = dict.pop(self, key)
+        self.history.record(dict.__setitem__, self, key, value)
+        return value
+
+
+# Binary heap (a list, so it iterates and prints like the plain open lists) whose push and pop
+# log every slot they overwrite. The sift steps mirror the standard heapq ones, so the heap
+# layout and pop order are exactly what heapq would give, and undo restores the exact layout.
+class TrackedHeap(list):
+    def __init__(self, history, items=()):
+        super().__init__(items)
+        heapq.heapify(self)
+        self.history = history
+
+    def _set(self, index, item):
+        self.history.record(list.__setitem__, self, index, self[index])
+        list.__setitem__(self, index, item)
+
+    def heappush(self, item):
+        list.append(self, item)
+        self.history.record(list.pop, self)
+        self._siftdown(0, len(self) - 1)
+
+    def heappop(self):
+        last = list.pop(self)
+        self.history.record(list.append, self, last)
+        if not self:
+            return last
+        item = self[0]
+        self._set(0, last)
+        self._siftup(0)
+        return item
+
+    # Move the item at pos up towards the root (heapq._siftdown)
+    def _siftdown(self, startpos, pos):
+        newitem = self[pos]
+        while pos > startpos:
+            parentpos = (pos - 1) >> 1
+            parent = self[parentpos]
+            if newitem < parent:
+                self._set(pos, parent)
+                pos = parentpos
+                continue
+            break
+        self._set(pos, newitem)
+
+    # Move the item at pos down to a leaf, then back up into place (heapq._siftup)
+    def _siftup(self, pos):
+        endpos = len(self)
+        startpos = pos
+        newitem = self[pos]
+        childpos = 2 * pos + 1
+        while childpos < endpos:
+            rightpos = childpos + 1
+            if rightpos < endpos and not self[childpos] < self[rightpos]:
+                childpos = rightpos
+            self._set(pos, self[childpos])
+            pos = childpos
+            childpos = 2 * pos + 1
+        self._set(pos, newitem)
+        self._siftdown(startpos, pos)
+
+
+# Save the current state of the search: starts a new undo step. The containers must be tracked
+# containers bound to history; they are stored by reference, only the scalars are kept as is.
 def save_state(open_set, visited, current_node, parents, open_dict, found, final_path, history):
-    # Append a deep copy of the current state to the history list
-    history.append((
-        copy.deepcopy(open_set),
-        copy.deepcopy(visited),
-        copy.deepcopy(current_node),
-        copy.deepcopy(parents),
-        copy.deepcopy(open_dict),
-        found,
-        copy.deepcopy(final_path),
-    ))
-
-# Load the previous state from history (for undo/back functionality)
+    history.save((open_set, visited, current_node, parents, open_dict, found, final_path))
+
+# Load the previous state from history (for undo/back functionality): reverts the last step
+# in place and returns the same tuple shape that save_state received
 def load_previous_state(history):
     if len(history) > 1:
-        history.pop()  # Remove the most recent state to revert to the previous one
-    return copy.deepcopy(history[-1])  # Return a copy of the last state in history
+        return history.undo()
+    return history.frames[-1][0]
 
 # Save the current state of the search (for bidirectional search)
 def save_state_bidirectional(queue_start, queue_goal, visited_start, visited_goal, expanded_node, parents_start, parents_goal, found, final_path, history):
-    # Append a deep copy of the current state to the history list
-    history.append((
-        copy.deepcopy(queue_start),
-        copy.deepcopy(queue_goal),
-        copy.deepcopy(visited_start),
-        copy.deepcopy(visited_goal),
-        copy.deepcopy(expanded_node),
-        copy.deepcopy(parents_start),
-        copy.deepcopy(parents_goal),
-        found,
-        copy.deepcopy(final_path)
-    ))
+    history.save((queue_start, queue_goal, visited_start, visited_goal, expanded_node,
+                  parents_start, parents_goal, found, final_path))
 
 # Load the previous state from history (for undo/back in bidirectional search)
 def load_previous_state_bidirectional(history):
     if len(history) > 1:
-        history.pop()  # Remove the most recent state to go back
-    return copy.deepcopy(history[-1])  # Return the previous state
+        return history.undo()
+    return history.frames[-1][0]
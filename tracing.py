@@ -0,0 +1,218 @@
+# Search instrumentation: tracers that observe the solvers instead of prints inside them
+#
+# The headless solvers (solve_astar, solve_jps, solve_bidirectional_greedy,
+# solve_bidirectional_astar) take an optional tracer and call it as the search runs:
+#
+#   on_expand(cell, side)    a cell was popped for expansion
+#   on_push(cell, priority, side)   a cell was queued with this priority (f for A*, h for greedy)
+#   on_close(cell, side)     every successor of the expanded cell has been queued
+#   on_meet(cell, cost)      the two sides of a bidirectional search joined at cell
+#   on_goal(path, cost)      the search finished with this path
+#
+# Cells are (row, col) positions; side is 'start' or 'goal' for the bidirectional searches and
+# None otherwise. With tracer=None (the default) the solvers skip every call, so an untraced
+# search pays one None check per event and builds nothing. Subclass Tracer and override only
+# the events you need, or combine the collectors below with MultiTracer.
+
+import json
+import time
+
+
+# Base tracer: every event does nothing
+class Tracer:
+    def on_expand(self, cell, side=None):
+        pass
+
+    def on_push(self, cell, priority, side=None):
+        pass
+
+    def on_close(self, cell, side=None):
+        pass
+
+    def on_meet(self, cell, cost):
+        pass
+
+    def on_goal(self, path, cost):
+        pass
+
+
+# Forward every event to several tracers, in order
+class MultiTracer(Tracer):
+    def __init__(self, *tracers):
+        self.tracers = tracers
+
+    def on_expand(self, cell, side=None):
+        for tracer in self.tracers:
+            tracer.on_expand(cell, side)
+
+    def on_push(self, cell, priority, side=None):
+        for tracer in self.tracers:
+            tracer.on_push(cell, priority, side)
+
+    def on_close(self, cell, side=None):
+        for tracer in self.tracers:
+            tracer.on_close(cell, side)
+
+    def on_meet(self, cell, cost):
+        for tracer in self.tracers:
+            tracer.on_meet(cell, cost)
+
+    def on_goal(self, path, cost):
+        for tracer in self.tracers:
+            tracer.on_goal(path, cost)
+
+
+# Count events by name ('expand', 'push', 'close', 'meet', 'goal'), and by side for the
+# bidirectional searches (counts[('expand', 'start')] and so on)
+class CountingTracer(Tracer):
+    def __init__(self):
+        self.counts = dict.fromkeys(('expand', 'push', 'close', 'meet', 'goal'), 0)
+
+    def _count(self, event, side):
+        self.counts[event] += 1
+        if side is not None:
+            key = (event, side)
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def on_expand(self, cell, side=None):
+        self._count('expand', side)
+
+    def on_push(self, cell, priority, side=None):
+        self._count('push', side)
+
+    def on_close(self, cell, side=None):
+        self._count('close', side)
+
+    def on_meet(self, cell, cost):
+        self.counts['meet'] += 1
+
+    def on_goal(self, path, cost):
+        self.counts['goal'] += 1
+
+
+# Histogram of non-negative integers (durations in nanoseconds) in power-of-two buckets:
+# bucket b holds the values v with v.bit_length() == b, i.e. 2**(b-1) <= v < 2**b
+class Histogram:
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.buckets[min(value.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    # Upper bound of the bucket holding the p-th percentile (0 < p <= 100), or 0 when empty
+    def percentile(self, p):
+        rank = p / 100 * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return 2 ** b
+        return 0
+
+    # (lower, upper, count) for every non-empty bucket
+    def rows(self):
+        return [(2 ** (b - 1) if b else 0, 2 ** b, n) for b, n in enumerate(self.buckets) if n]
+
+
+# Time the phases of a search into Histograms of nanoseconds:
+#   'select'  from one expansion's close (or the search's start) to the next expansion, i.e. the
+#             time spent popping the queue and skipping stale entries
+#   'expand'  from an expansion to its close, i.e. the time spent generating and queueing successors
+# A tracer can be reused across searches; the gap between them is not counted.
+class TimingTracer(Tracer):
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.phases = {'select': Histogram(), 'expand': Histogram()}
+        self.last = None  # Time of the previous expand or close event of the current search
+
+    def on_expand(self, cell, side=None):
+        now = self.clock()
+        if self.last is not None:
+            self.phases['select'].add(now - self.last)
+        self.last = now
+
+    def on_close(self, cell, side=None):
+        now = self.clock()
+        if self.last is not None:
+            self.phases['expand'].add(now - self.last)
+        self.last = now
+
+    def on_goal(self, path, cost):
+        self.last = None
+
+    # Print count, mean, p50/p99 bucket bound and max per phase
+    def print_report(self):
+        print(f"{'phase':<8}{'count':>9}{'mean ns':>10}{'p50 ns':>9}{'p99 ns':>9}{'max ns':>10}")
+        for name, histogram in self.phases.items():
+            print(f"{name:<8}{histogram.count:>9}{histogram.mean():>10.0f}{histogram.percentile(50):>9}"
+                  f"{histogram.percentile(99):>9}{histogram.max:>10}")
+
+
+# Write one JSON object per event to a text stream (JSON lines), e.g.
+#   {"event": "push", "t": 5120, "cell": [3, 4], "priority": 12, "side": "start"}
+# t is nanoseconds since the tracer's first event; side is left out when it is None.
+class JsonlTracer(Tracer):
+    def __init__(self, stream, clock=time.perf_counter_ns):
+        self.stream = stream
+        self.clock = clock
+        self.origin = None
+
+    def _write(self, record):
+        now = self.clock()
+        if self.origin is None:
+            self.origin = now
+        record['t'] = now - self.origin
+        self.stream.write(json.dumps(record) + '\n')
+
+    def on_expand(self, cell, side=None):
+        record = {'event': 'expand', 'cell': cell}
+        if side is not None:
+            record['side'] = side
+        self._write(record)
+
+    def on_push(self, cell, priority, side=None):
+        record = {'event': 'push', 'cell': cell, 'priority': priority}
+        if side is not None:
+            record['side'] = side
+        self._write(record)
+
+    def on_close(self, cell, side=None):
+        record = {'event': 'close', 'cell': cell}
+        if side is not None:
+            record['side'] = side
+        self._write(record)
+
+    def on_meet(self, cell, cost):
+        self._write({'event': 'meet', 'cell': cell, 'cost': cost})
+
+    def on_goal(self, path, cost):
+        self._write({'event': 'goal', 'path': path, 'cost': cost})
+
+
+# Read a JSONL trace back as a list of event dicts (cells and paths come back as lists)
+def load_trace(stream):
+    return [json.loads(line) for line in stream if line.strip()]
+
+
+if __name__ == "__main__":
+    from maze import make_maze
+    from a_star import solve_astar
+
+    # Profile A* on a seeded maze: event counts and per-phase timings
+    maze = make_maze('backtracker', 101, 101, rng=0)
+    counter, timer = CountingTracer(), TimingTracer()
+    result = solve_astar(maze.grid, maze.start, maze.goal, tracer=MultiTracer(counter, timer))
+    print(f"Path length {result.cost}, events {counter.counts}")
+    timer.print_report()
@@ -2,7 +2,11 @@
 
 import pygame
 import math
-from constants import ROWS, COLS, CELL_SIZE, start, goal, moves
+from constants import CELL_SIZE, BUTTON_HEIGHT, NUM_BUTTON_ROWS
+
+# Window size in pixels for a rows x cols maze with the button rows below it
+def window_size(rows, cols):
+    return cols * CELL_SIZE, rows * CELL_SIZE + NUM_BUTTON_ROWS * BUTTON_HEIGHT
 
 def draw_arrow(screen, from_cell, to_cell, color=(100, 100, 255)):
     fx, fy = from_cell[1] * CELL_SIZE + CELL_SIZE // 2, from_cell[0] * CELL_SIZE + CELL_SIZE // 2
@@ -15,10 +19,11 @@ def draw_arrow(screen, from_cell, to_cell, color=(100, 100, 255)):
         end_y = ty - arrow_size * math.sin(angle + delta)
         pygame.draw.line(screen, color, (tx, ty), (end_x, end_y), 4)
 
-def draw_grid(screen, visited, path, parents, obstacles, open_dict):
+def draw_grid(screen, visited, path, parents, maze, open_dict):
     font = pygame.font.SysFont(None, 20)
-    for r in range(ROWS):
-        for c in range(COLS):
+    obstacles, start, goal = maze.grid, maze.start, maze.goal
+    for r in range(maze.rows):
+        for c in range(maze.cols):
             rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
             color = (255, 255, 255)
             pos = (r, c)
@@ -49,10 +54,11 @@ def draw_grid(screen, visited, path, parents, obstacles, open_dict):
             draw_arrow(screen, parent, pos)
 
 
-def draw_grid_bidirectional(screen, visited_start, visited_goal, start_path, goal_path, final_path, parents, obstacles, costs):
+def draw_grid_bidirectional(screen, visited_start, visited_goal, start_path, goal_path, final_path, parents, maze, costs):
     font = pygame.font.SysFont(None, 20)
-    for r in range(ROWS):
-        for c in range(COLS):
+    obstacles, start, goal = maze.grid, maze.start, maze.goal
+    for r in range(maze.rows):
+        for c in range(maze.cols):
             rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
             color = (255, 255, 255)  # Default white
 
@@ -86,10 +92,11 @@ def draw_grid_bidirectional(screen, visited_start, visited_goal, start_path, goa
         if parent is not None:
             draw_arrow(screen, parent, pos)
 
-def draw_grid_backward_chaining(screen, visited_start, visited_goal, start_path, goal_path, final_path, parents, obstacles, rule_map=None):
+def draw_grid_backward_chaining(screen, visited_start, visited_goal, start_path, goal_path, final_path, parents, maze, rule_map=None):
     font = pygame.font.SysFont(None, 14)
-    for r in range(ROWS):
-        for c in range(COLS):
+    obstacles, start, goal = maze.grid, maze.start, maze.goal
+    for r in range(maze.rows):
+        for c in range(maze.cols):
             rect = pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
             color = (255, 255, 255)
             pos = (r, c)
@@ -128,19 +135,16 @@ def draw_grid_backward_chaining(screen, visited_start, visited_goal, start_path,
             draw_arrow(screen, parent, pos)
 
 
-def draw_candidate_arrows(screen, current_pos, visited, obstacles):
-    from constants import ROWS, COLS, moves
-    for move in moves:
-        neighbor = (current_pos[0] + move[0], current_pos[1] + move[1])
-        # Check if neighbor is within bounds
-        if (0 <= neighbor[0] < ROWS and 0 <= neighbor[1] < COLS):
-            if neighbor not in obstacles and neighbor not in visited:
-                draw_arrow(screen, current_pos, neighbor, color=(255, 140, 0))
+def draw_candidate_arrows(screen, current_pos, visited, maze):
+    # The grid only returns in-bounds, non-obstacle neighbors
+    for neighbor in maze.grid.neighbors(current_pos):
+        if neighbor not in visited:
+            draw_arrow(screen, current_pos, neighbor, color=(255, 140, 0))
 
 
 def draw_buttons(screen):
     font = pygame.font.SysFont(None, 24)
-    top_y = ROWS * CELL_SIZE
+    top_y = screen.get_height() - BUTTON_HEIGHT  # Buttons sit below the maze, whatever its size
     step_rect = pygame.Rect(0, top_y, 124, 35)
     back_rect = pygame.Rect(124, top_y, 124, 35)
     rand_rect = pygame.Rect(248, top_y, 124, 35)